@@ -47,6 +47,8 @@
         'security/connector_security.xml',
         'security/ir.model.access.csv',
         'views/ebay_backend_views.xml',
+        'views/ebay_api_stats_views.xml',
+        'views/ebay_order_backfill_views.xml',
         'views/connector_ebay_menu.xml',
         'data/ebay_scheduler.xml',
         'data/ebay_data.xml',
@@ -21,9 +21,20 @@
 ##############################################################################
 # This project is based on connector-magneto, developed by Camptocamp SA
 
+import copy
+import hashlib
+import json
 import logging
+import os
+import random
+import threading
+import time
 import dateutil.parser
+import dateutil.tz
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from lxml import etree
 
 import unicodecsv
@@ -32,7 +43,18 @@ from odoo.addons.component.core import AbstractComponent
 from odoo.addons.queue_job.exception import FailedJobError, RetryableJobError
 
 from ebaysdk.exception import ConnectionError
+from ebaysdk.response import Response
 from ebaysdk.trading import Connection as Trading
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.models import Response as HTTPResponse
+from requests.exceptions import RequestException
+
+from ..exception import EbayRetryableError, EbayFailedError
+from .call_stats import api_call_stats
+from .rate_limiter import EbayRateLimiter
+from .response_cache import response_cache
+from .trading_decoder import TradingResponsePage, read_ack
 
 _logger = logging.getLogger(__name__)
 
@@ -42,55 +64,429 @@ EBAY_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
 
 EBAY_ORDER_ID_PATTERN = '^([\d]{12}-'
 
+EBAY_PRODUCTION_DOMAIN = 'api.ebay.com'
+
+# Idle connections kept by key, extra connections released are closed
+MAX_IDLE_CONNECTIONS = 4
+
+# eBay error codes, the errors not listed are permanent unless eBay
+# classifies them as SystemError
+EBAY_THROTTLING_ERROR_CODES = {518}  # call usage limit reached
+EBAY_TRANSIENT_ERROR_CODES = {10007}  # internal error to the application
+
+EBAY_CALL_RETRIES = 3  # retries in process of the transient errors
+EBAY_RETRY_BASE_DELAY = 1  # seconds
+EBAY_RETRY_MAX_DELAY = 30  # seconds
+EBAY_JOB_RETRY_DELAY = 60  # seconds, job postponed after the retries
+EBAY_THROTTLING_DELAY = 300  # seconds, job postponed when throttled
+
 _EBAY_TRADING_METHOD_LIST = {
     'ebay_sale_order_search':'GetOrders',
-    'ebay_sale_order_read':'GetOrders'
+    'ebay_sale_order_read':'GetOrders',
+    'ebay_product_product_search':'GetSellerList',
 }
 
+# Time to live (seconds) of the cached responses of the idempotent
+# methods, the methods not listed are never cached
+EBAY_CACHE_TTL = {
+    'ebay_sale_order_read':60,
+}
+
+
+def as_list(node):
+    """ ``ebaysdk`` returns a dict for a repeated node with only one
+    element, and nothing when there is no element """
+    if not node:
+        return []
+    if isinstance(node, list):
+        return node
+    return [node]
+
+
+def ebay_value(node, default=None):
+    """ Return the text of a node which may have attributes
+    (``{'value': '1.0', '_currencyID': 'EUR'}``) """
+    if isinstance(node, dict):
+        return node.get('value', default)
+    return default if node is None else node
+
+
+def to_odoo_datetime(value):
+    """ Convert an eBay ISO 8601 datetime to an Odoo datetime string """
+    if not value:
+        return None
+    date = dateutil.parser.parse(value)
+    if date.tzinfo:
+        date = date.astimezone(dateutil.tz.tzutc()).replace(tzinfo=None)
+    return Datetime.to_string(date)
+
+
+def backoff_delay(attempt, base, cap):
+    """ Exponential backoff with jitter: between the half and the full
+    delay ``base * 2 ** attempt``, bounded by ``cap`` """
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2. + random.uniform(0, delay / 2.)
+
+
+def _ebay_error_details(response):
+    """ Return the error codes and classifications of an eBay response """
+    codes, classifications = set(), set()
+    try:
+        data = response.dict() or {}
+    except Exception:
+        return codes, classifications
+    for error in as_list(data.get('Errors')):
+        if error.get('SeverityCode') == 'Warning':
+            continue
+        try:
+            codes.add(int(error.get('ErrorCode')))
+        except (TypeError, ValueError):
+            pass
+        classifications.add(error.get('ErrorClassification'))
+    return codes, classifications
+
+
+def classify_ebay_error(error):
+    """ Classify an error raised by an eBay call
+
+    :returns: 'throttled', 'transient' or 'permanent'
+    """
+    if isinstance(error, RequestException):
+        # timeouts, connection reset, ...
+        return 'transient'
+    response = getattr(error, 'response', None)
+    status_code = getattr(response, 'status_code', None)
+    if status_code == 429:
+        return 'throttled'
+    if status_code and status_code >= 500:
+        return 'transient'
+    codes, classifications = _ebay_error_details(response)
+    if codes & EBAY_THROTTLING_ERROR_CODES:
+        return 'throttled'
+    if codes & EBAY_TRANSIENT_ERROR_CODES or 'SystemError' in classifications:
+        return 'transient'
+    return 'permanent'
+
+
+def ebay_error_codes(error):
+    """ Return the codes identifying an error raised by an eBay call,
+    used by the statistics of the calls """
+    if isinstance(error, RequestException):
+        return [error.__class__.__name__]
+    response = getattr(error, 'response', None)
+    codes = sorted(str(code) for code in _ebay_error_details(response)[0])
+    status_code = getattr(response, 'status_code', None)
+    if not codes and status_code and status_code != 200:
+        codes = ['HTTP %s' % status_code]
+    return codes or ['Unknown']
+
+
+def _response_size(response):
+    try:
+        return len(response.content or b'')
+    except Exception:
+        return 0
+
+
+class RecordReplayMixin(object):
+    """ Record the responses of eBay in fixtures, or replay them
+
+    The fixtures are stored in ``fixture_path``, one file per method and
+    arguments: ``<verb>-<digest of the arguments>.xml``.
+    """
+    fixture_path = None
+    replay = False
+
+    def _fixture_file(self):
+        arguments = json.dumps(self._request_dict, sort_keys=True, default=str)
+        digest = hashlib.sha1(arguments.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.fixture_path, '%s-%s.xml' % (self.verb, digest))
+
+    def execute_request(self):
+        fixture_file = self._fixture_file()
+        if self.replay:
+            if not os.path.exists(fixture_file):
+                raise IOError('No recorded eBay response for %s %s (%s)'
+                              % (self.verb, self._request_dict, fixture_file))
+            response = HTTPResponse()
+            with open(fixture_file, 'rb') as fixture:
+                response._content = fixture.read()
+            response.status_code = 200
+            response.reason = 'OK'
+            response.url = self.request.url
+            self.response = response
+            return
+        super(RecordReplayMixin, self).execute_request()
+        if self.response.status_code == 200:
+            if not os.path.isdir(self.fixture_path):
+                os.makedirs(self.fixture_path)
+            with open(fixture_file, 'wb') as fixture:
+                fixture.write(self.response.content)
+
+
+class StreamingTrading(Trading):
+    """ Trading connection which doesn't parse the responses
+
+    The raw XML of the response (``response.content``) is decoded by
+    :class:`~.trading_decoder.TradingResponsePage`. Only the failed
+    responses are parsed by ``ebaysdk``, to build the error.
+    """
+
+    def process_response(self, parse_response=True):
+        super(StreamingTrading, self).process_response(parse_response=False)
+
+    def error_check(self):
+        if self.response.status_code == 200 and read_ack(self.response.content) != 'Failure':
+            return
+        self.response = Response(self.response._obj,
+                                 verb=self.verb,
+                                 list_nodes=self._list_nodes,
+                                 datetime_nodes=self.datetime_nodes)
+        super(StreamingTrading, self).error_check()
+
+
+class KeepAliveSession(Session):
+    """ HTTP session which survives the ``close`` done by ``ebaysdk``
+
+    ``ebaysdk`` closes its session after each response, so every call
+    opens a new TCP connection and does a new TLS handshake. The pooled
+    connections use this session, which is only closed when the
+    connection is evicted from the pool.
+    """
+
+    def close(self):
+        return
+
+    def shutdown(self):
+        super(KeepAliveSession, self).close()
+
+
+class TradingConnectionPool(object):
+    """ Per-process pool of Trading API connections
+
+    The connections are keyed by database, backend, domain and
+    credentials. A connection is handed to one caller at a time
+    (``ebaysdk`` keeps the state of the last call on the connection) and
+    given back to the pool afterwards, keeping its HTTP session alive.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE_CONNECTIONS):
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._max_idle = max_idle
+
+    @staticmethod
+    def _close(connection):
+        session = getattr(connection, 'session', None)
+        if isinstance(session, KeepAliveSession):
+            session.shutdown()
+        elif session is not None:
+            session.close()
+
+    def _evict_keys(self, keys):
+        """ Remove the keys from the pool, must be called with the lock """
+        connections = []
+        for key in keys:
+            connections.extend(self._idle.pop(key, []))
+        return connections
+
+    def acquire(self, key, factory):
+        """ Return an idle connection for ``key`` or a new one
+
+        The connections kept for the same backend with other credentials
+        (changed from another process) are evicted.
+        """
+        with self._lock:
+            stale = [k for k in self._idle if k[:2] == key[:2] and k[2:4] != key[2:4]]
+            evicted = self._evict_keys(stale)
+            idle = self._idle.get(key)
+            connection = idle.pop() if idle else None
+        for evicted_connection in evicted:
+            self._close(evicted_connection)
+        if connection is None:
+            connection = factory()
+        return connection
+
+    def release(self, key, connection):
+        """ Give back a connection to the pool """
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append(connection)
+                return
+        self._close(connection)
+
+    def discard(self, connection):
+        """ Close a connection which must not go back to the pool """
+        self._close(connection)
+
+    def evict(self, dbname, backend_id):
+        """ Close all the connections of a backend """
+        with self._lock:
+            keys = [k for k in self._idle if k[:2] == (dbname, backend_id)]
+            evicted = self._evict_keys(keys)
+        for connection in evicted:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self, key, factory):
+        connection = self.acquire(key, factory)
+        try:
+            yield connection
+        except ConnectionError:
+            # eBay answered: the HTTP session is still usable
+            self.release(key, connection)
+            raise
+        except Exception:
+            # network or unexpected error: don't reuse the session
+            self.discard(connection)
+            raise
+        else:
+            self.release(key, connection)
+
+
+_trading_pool = TradingConnectionPool()
+
 
 class EbayAPI(object):
 
     def __init__(self, backend):
         """
         :param backend: eBay Backend
-        :type location: :class:`MagentoLocation`
+        :type backend: :class:`ebay.backend`
         """
         self._backend = backend
-        self._api = None
-        self._method = None
-
-    @property
-    def api(self):
-        api = None
-        if self.method in _EBAY_TRADING_METHOD_LIST.keys():
-            api = Trading(config_file=None,
-                          appid=self._backend.client_id,
-                          devid=self._backend.dev_id,
-                          certid=self._backend.client_secret,
-                          token=self._backend.token)
-            self.method = _EBAY_TRADING_METHOD_LIST[self.method]
-        self._api = api
-        return self._api
+        self._dbname = backend.env.cr.dbname
+        self._backend_id = backend.id
+        self._connection_kwargs = None
+        self._connection_key = None
+        self._rate_limiter = None
+        self._api_mode = None
+        self._fixture_path = None
+
+    @staticmethod
+    def evict_connections(backend):
+        """ Close the pooled connections of the backends, used when
+        their credentials change """
+        for record in backend:
+            _trading_pool.evict(record.env.cr.dbname, record.id)
+
+    def _get_connection_kwargs(self):
+        """ Credentials and endpoint of the backend """
+        backend = self._backend
+        if backend.api_mode == 'fake':
+            return {
+                'domain':backend.api_fake_url or 'localhost:8765',
+                'appid':'fake',
+                'devid':'fake',
+                'certid':'fake',
+                'token':'fake',
+            }
+        return {
+            'domain':EBAY_PRODUCTION_DOMAIN,
+            'appid':backend.client_id,
+            'devid':backend.dev_id,
+            'certid':backend.client_secret,
+            'token':backend.token,
+        }
+
+    def _prepare_connection(self):
+        """ Read the backend once per session, so the connections can be
+        built later without using the environment """
+        if self._connection_kwargs is None:
+            kwargs = self._get_connection_kwargs()
+            self._api_mode = self._backend.api_mode or 'live'
+            self._fixture_path = self._backend.api_fixture_path
+            # the secrets are not kept in clear in the pool keys
+            digest = hashlib.sha1(repr(sorted(kwargs.items()) + [
+                self._api_mode, self._fixture_path]).encode('utf-8')).hexdigest()
+            self._connection_kwargs = kwargs
+            self._connection_key = (self._dbname, self._backend_id, kwargs['domain'], digest)
+            self._rate_limiter = EbayRateLimiter(
+                self._dbname, self._backend_id,
+                burst=self._backend.api_call_burst,
+                rate=self._backend.api_call_rate,
+                daily_limit=self._backend.api_daily_call_limit,
+            )
+        return self._connection_key
+
+    def _new_connection(self, stream=False):
+        connection_class = StreamingTrading if stream else Trading
+        if self._api_mode in ('record', 'replay'):
+            connection_class = type('RecordReplay%s' % connection_class.__name__,
+                                    (RecordReplayMixin, connection_class), {})
+        connection = connection_class(config_file=None, **self._connection_kwargs)
+        if self._api_mode in ('record', 'replay'):
+            if not self._fixture_path:
+                raise ValueError('A fixture directory is required to record '
+                                 'or replay the eBay responses.')
+            connection.fixture_path = self._fixture_path
+            connection.replay = self._api_mode == 'replay'
+        elif self._api_mode == 'fake':
+            # the fake server is served over HTTP
+            connection.config.set('https', False, force=True)
+        session = KeepAliveSession()
+        session.mount('http://', HTTPAdapter(max_retries=3))
+        session.mount('https://', HTTPAdapter(max_retries=3))
+        connection.session = session
+        return connection
 
     def __enter__(self):
         # we do nothing, api is lazy
         return self
 
     def __exit__(self, type, value, traceback):
-        if self._api is not None:
-            self._api.__exit__(type, value, traceback)
-
-    def call(self, method, arguments):
-        try:
-            self.method = method
-            result = self.api.execute(self.method, arguments)
-        except ConnectionError as e:
-            _logger.error(e.response.dict())
-            raise e
-        except:
-            _logger.error("api.call('%s', %s) failed", method, arguments)
-            raise
-        return result
+        # the connections stay in the pool for the next sessions
+        return
+
+    def _raise_classified(self, method, error, kind, attempt):
+        if isinstance(error, ConnectionError) and error.response is not None:
+            _logger.error(error.response.dict())
+        message = 'eBay call %s failed (%s error): %s' % (method, kind, error)
+        if kind == 'throttled':
+            raise EbayRetryableError(message, seconds=int(backoff_delay(
+                attempt, EBAY_THROTTLING_DELAY, EBAY_THROTTLING_DELAY * 8)))
+        if kind == 'transient':
+            raise EbayRetryableError(message, seconds=int(backoff_delay(
+                attempt, EBAY_JOB_RETRY_DELAY, EBAY_JOB_RETRY_DELAY * 32)))
+        raise EbayFailedError(message)
+
+    def call(self, method, arguments, stream=False):
+        """ Call a Trading API method
+
+        :param stream: when True, the response is not parsed, its raw
+                       XML is in ``response.content``
+        """
+        verb = _EBAY_TRADING_METHOD_LIST.get(method)
+        if not verb:
+            raise NotImplementedError('%s is not a supported eBay method' % method)
+        key = self._prepare_connection() + (stream,)
+        attempt = 0
+        while True:
+            self._rate_limiter.acquire(verb)
+            start = time.time()
+            try:
+                with _trading_pool.connection(key, lambda: self._new_connection(stream)) as api:
+                    response = api.execute(verb, arguments)
+                api_call_stats.record(self._dbname, self._backend_id, verb, time.time() - start,
+                                      size=_response_size(response))
+                return response
+            except (ConnectionError, RequestException) as e:
+                api_call_stats.record(self._dbname, self._backend_id, verb, time.time() - start,
+                                      size=_response_size(getattr(e, 'response', None)),
+                                      error_codes=ebay_error_codes(e), failed=True)
+                kind = classify_ebay_error(e)
+                if kind == 'transient' and attempt < EBAY_CALL_RETRIES:
+                    delay = backoff_delay(attempt, EBAY_RETRY_BASE_DELAY, EBAY_RETRY_MAX_DELAY)
+                    _logger.warning("api.call('%s') failed (%s), retry in %.1f seconds",
+                                    method, e, delay)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                self._raise_classified(method, e, kind, attempt)
+            except:
+                _logger.error("api.call('%s', %s) failed", method, arguments)
+                raise
 
 
 class EbayCRUDAdapter(AbstractComponent):
@@ -126,7 +522,7 @@ class EbayCRUDAdapter(AbstractComponent):
         """ Delete a record on the external system """
         raise NotImplementedError
 
-    def _call(self, method, arguments):
+    def _call(self, method, arguments, **kwargs):
         try:
             ebay_api = getattr(self.work, 'ebay_api')
         except AttributeError:
@@ -135,7 +531,7 @@ class EbayCRUDAdapter(AbstractComponent):
                 'EbayAPI instance to be able to use the '
                 'Backend Adapter.'
             )
-        return ebay_api.call(method, arguments)
+        return ebay_api.call(method, arguments, **kwargs)
 
 
 class GenericAdapter(AbstractComponent):
@@ -154,13 +550,245 @@ class GenericAdapter(AbstractComponent):
             return self._apply_on
         return ''
 
+    # Pagination of the search calls, set on the adapters of the
+    # models returned page by page by eBay
+    _page_size = 100
+    _record_list_path = None  # e.g. ('OrderArray', 'Order')
+    _has_more_key = None  # e.g. 'HasMoreOrders'
+    # decode the pages with the streaming decoder instead of ebaysdk
+    _stream_records = False
+
+    # eBay fields read by ``_parse_record`` for each key of the parsed
+    # records, relative to a record of ``_record_list_path``. The keys of
+    # the children are prefixed by the key of their list ('lines.sku').
+    # When set, the searches only request the fields used by the import
+    # mapper of the model (OutputSelector)
+    _output_selectors = None
+
+    def _extra_output_fields(self):
+        """ Keys of the parsed records to request to eBay in addition
+        to the ones used by the import mapper """
+        return []
+
+    def _pagination_output_fields(self):
+        return [self._has_more_key, 'PaginationResult', 'PageNumber']
+
+    def _output_selector(self):
+        """ Return the OutputSelector of the searches, None to get the
+        full records """
+        if not self._output_selectors:
+            return None
+        if getattr(self, '_output_selector_paths', None) is None:
+            mapper = self.component(usage='import.mapper')
+            keys = set(mapper.record_fields()) | set(self._extra_output_fields())
+            paths = set()
+            for key in keys:
+                for selected_key, selected_paths in self._output_selectors.items():
+                    # a key without its sub-keys selects all of them
+                    if selected_key == key or selected_key.startswith(key + '.'):
+                        paths.update(selected_paths)
+            record_path = '.'.join(self._record_list_path)
+            self._output_selector_paths = sorted(
+                ['%s.%s' % (record_path, path) for path in paths] +
+                [field for field in self._pagination_output_fields() if field])
+        return self._output_selector_paths
+
+    def _search_arguments(self, filters, page_number):
+        arguments = dict(filters or {})
+        pagination = dict(arguments.get('Pagination') or {})
+        pagination.update({'EntriesPerPage':self._page_size,
+                           'PageNumber':page_number})
+        arguments['Pagination'] = pagination
+        output_selector = self._output_selector()
+        if output_selector and 'OutputSelector' not in arguments:
+            arguments['OutputSelector'] = output_selector
+        return arguments
+
+    def _fetch_page(self, filters, page_number):
+        """ Call eBay for one page of the search, return the response dict """
+        method = '%s_search' % self._get_model().replace('.', '_')
+        try:
+            response = self._call(method, self._search_arguments(filters, page_number),
+                                  stream=self._stream_records)
+        except RetryableJobError as err:
+            # the batch import resumes the search at this page
+            err.page_number = page_number
+            raise
+        if self._stream_records:
+            header_tags = [self._has_more_key] if self._has_more_key else []
+            return TradingResponsePage(response.content, self._record_list_path, header_tags)
+        return response.dict()
+
+    def _has_more_pages(self, page, page_number):
+        if self._has_more_key:
+            return page.get(self._has_more_key) == 'true'
+        total_pages = (page.get('PaginationResult') or {}).get('TotalNumberOfPages')
+        return bool(total_pages) and page_number < int(total_pages)
+
+    def _page_records(self, page):
+        if isinstance(page, TradingResponsePage):
+            return page.records()
+        node = page
+        for key in self._record_list_path:
+            node = (node or {}).get(key)
+        return as_list(node)
+
+    def _parse_record(self, record):
+        """ Convert an eBay record to the data used by the importers """
+        return record
+
+    def _iter_page_records(self, records):
+        """ Parse the records of a page one at a time, dropping the
+        eBay data of the records already parsed """
+        if not isinstance(records, list):
+            # streamed records
+            for record in records:
+                yield self._parse_record(record)
+            return
+        records.reverse()
+        while records:
+            yield self._parse_record(records.pop())
+
+    def _get_prefetch_pages(self):
+        """ Number of pages fetched in advance on threads while the
+        current page is imported, 0 to fetch them one after the other """
+        return 0
+
+    def _total_pages(self, page):
+        total_pages = (page.get('PaginationResult') or {}).get('TotalNumberOfPages')
+        return int(total_pages) if total_pages else None
+
+    def _prefetch_pages(self, filters, first_page, last_page, prefetch):
+        """ Fetch the pages on a pool of ``prefetch`` threads, keeping
+        at most ``prefetch`` pages in advance, yield them in order.
+
+        Only the eBay calls are done on the threads, the records are
+        parsed and imported in the thread of the job.
+        """
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        pending = deque()
+        next_page = first_page
+        try:
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < prefetch:
+                    pending.append((next_page, executor.submit(self._fetch_page, filters, next_page)))
+                    next_page += 1
+                page_number, future = pending.popleft()
+                yield page_number, future.result()
+        finally:
+            for __, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _prepare_search(self):
+        """ Read in the thread of the job what the searches need, so they
+        can run on other threads without using the ORM
+
+        :returns: the number of pages to prefetch
+        """
+        self.work.ebay_api._prepare_connection()
+        self._output_selector()
+        return self._get_prefetch_pages()
+
+    def _iter_pages(self, filters, page_number, prefetch=None):
+        """ Yield ``(page_number, page)`` for the pages of a search """
+        page = self._fetch_page(filters, page_number)
+        has_more = self._has_more_pages(page, page_number)
+        total_pages = self._total_pages(page)
+        yield page_number, page
+        page = None
+        if prefetch is None:
+            prefetch = self._get_prefetch_pages()
+        if has_more and prefetch > 0 and total_pages:
+            # the connection and the OutputSelector have been prepared
+            # by the first call, the threads don't need to read the backend
+            for item in self._prefetch_pages(filters, page_number + 1, total_pages, prefetch):
+                yield item
+            return
+        while has_more:
+            page_number += 1
+            page = self._fetch_page(filters, page_number)
+            has_more = self._has_more_pages(page, page_number)
+            yield page_number, page
+            page = None
+
+    def parse_page(self, page):
+        """ Return the list of the parsed records of a page """
+        return list(self._iter_page_records(self._page_records(page)))
+
+    def _first_page_number(self, filters):
+        return int(((filters or {}).get('Pagination') or {}).get('PageNumber') or 1)
+
+    def search_pages(self, filters=None):
+        """ Follow the eBay pagination of a search
+
+        Yield a tuple ``(page_number, records)`` for each page, where
+        ``records`` is an iterator on the parsed records of the page.
+        The next page is only requested when the previous one has been
+        consumed, so only one page is kept in memory, unless the adapter
+        prefetches pages (see :meth:`_get_prefetch_pages`). The search
+        starts at the page number given in the ``Pagination`` of the
+        filters. The adapters without pagination return one page.
+        """
+        if not self._record_list_path:
+            yield 1, iter(self.search(filters) or [])
+            return
+        page_number = self._first_page_number(filters)
+        for page_number, page in self._iter_pages(filters, page_number):
+            records = self._page_records(page)
+            del page
+            yield page_number, self._iter_page_records(records)
+
+    def _search_records(self, filters):
+        for __, records in self.search_pages(filters):
+            for record in records:
+                yield record
+
+    def _cache_tag(self, external_id=None):
+        """ Tag of the cached responses of a record, or of the searches
+        of the model when there is no ``external_id`` """
+        return (self.backend_record.env.cr.dbname, self.backend_record.id,
+                self._get_model(), external_id and str(external_id))
+
+    def _invalidate_cache(self, external_id=None):
+        response_cache.invalidate(self._cache_tag())
+        if external_id:
+            response_cache.invalidate(self._cache_tag(external_id))
+
+    def _cached_call(self, method, arguments, fetch, external_id=None):
+        """ Return the result of ``fetch()``, cached when ``method`` is
+        listed in ``EBAY_CACHE_TTL``
+
+        The callers get a copy of the cached result.
+        """
+        ttl = EBAY_CACHE_TTL.get(method)
+        if not ttl:
+            return fetch()
+        dbname, backend_id = self.backend_record.env.cr.dbname, self.backend_record.id
+        key = (dbname, backend_id, method, json.dumps(arguments, sort_keys=True, default=str))
+        hit, result = response_cache.get(key)
+        api_call_stats.record_cache_lookup(dbname, backend_id,
+                                           _EBAY_TRADING_METHOD_LIST.get(method, method), hit)
+        if not hit:
+            result = fetch()
+            response_cache.set(key, result, ttl, tags=(self._cache_tag(external_id),))
+        return copy.deepcopy(result)
+
     def search(self, filters=None):
         """ Search records according to some criterias
         and returns a list of ids
 
-        :rtype: list
+        When the adapter defines a ``_record_list_path``, the search
+        follows the eBay pagination and returns a generator of the
+        parsed records.
+
+        :rtype: list | generator
         """
-        return self._call('%s_search' % self._get_model().replace('.', '_'), filters if filters else {})
+        if self._record_list_path:
+            return self._search_records(filters)
+        method = '%s_search' % self._get_model().replace('.', '_')
+        arguments = filters if filters else {}
+        return self._cached_call(method, arguments, lambda: self._call(method, arguments))
 
     def read(self, external_id, attributes=None):
         """ Returns the information of a record
@@ -168,12 +796,14 @@ class GenericAdapter(AbstractComponent):
         :rtype: dict
         """
         if external_id and isinstance(external_id, (list, tuple)):
-            arguments = external_id
+            arguments = list(external_id)
         else:
             arguments = [external_id]
         if attributes:
             arguments.append(attributes)
-        return self._call('%s_read' % self._get_model().replace('.', '_'), [arguments])
+        method = '%s_read' % self._get_model().replace('.', '_')
+        return self._cached_call(method, [arguments], lambda: self._call(method, [arguments]),
+                                 external_id=arguments[0])
 
     def search_read(self, filters=None):
         """ Search records according to some criterias
@@ -182,13 +812,22 @@ class GenericAdapter(AbstractComponent):
 
     def create(self, data):
         """ Create a record on the external system """
+        self._invalidate_cache()
         return self._call('%s_create' % self._get_model(), [data])
 
     def write(self, id, data):
         """ Update records on the external system """
-        return self._call('%s_update' % self._get_model(),
-                          [int(id), data])
+        self._invalidate_cache(id)
+        try:
+            return self._call('%s_update' % self._get_model(),
+                              [int(id), data])
+        finally:
+            self._invalidate_cache(id)
 
     def delete(self, id):
         """ Delete a record on the external system """
-        return self._call('%s.delete' % self._get_model(), [int(id)])
+        self._invalidate_cache(id)
+        try:
+            return self._call('%s.delete' % self._get_model(), [int(id)])
+        finally:
+            self._invalidate_cache(id)
@@ -21,6 +21,7 @@
 ##############################################################################
 # This project is based on connector-magneto, developed by Camptocamp SA
 
+from odoo import fields, models, tools
 from odoo.addons.component.core import Component
 
 
@@ -42,3 +43,87 @@ class EbayModelBinder(Component):
         'ebay.sale.order.line',
         'ebay.res.partner',
     ]
+
+    def _bindings_cache(self):
+        """ Bindings of the model known by the session, see
+        ``components/sync_cache.py`` """
+        cache = getattr(self.work, 'ebay_cache', None)
+        if cache is None:
+            return None
+        return cache.bindings.setdefault(self.model._name, {})
+
+    def to_internal_many(self, external_ids, unwrap=False):
+        """ Give the Odoo records of many external ids in one query
+
+        :param external_ids: external ids for which we want the Odoo records
+        :param unwrap: if True, returns the normal record
+                       else return the binding record
+        :return: a dict of the Odoo records by external id, the external
+                 ids without binding are not in the dict
+        """
+        external_ids = list({tools.ustr(external_id) for external_id in external_ids if external_id})
+        if not external_ids:
+            return {}
+        bindings = self.model.with_context(active_test=False).search(
+            [(self._external_field, 'in', external_ids),
+             (self._backend_field, '=', self.backend_record.id)]
+        )
+        result = {}
+        for binding in bindings:
+            result[binding[self._external_field]] = binding[self._odoo_field] if unwrap else binding
+        cache = self._bindings_cache()
+        if cache is not None:
+            cache.update(dict.fromkeys(external_ids, False))
+            cache.update((binding[self._external_field], binding.id) for binding in bindings)
+        return result
+
+    def prefetch(self, external_ids):
+        """ Load the bindings of the external ids in the cache of the
+        session, :meth:`to_internal` then answers without query """
+        cache = self._bindings_cache()
+        if cache is None:
+            return
+        missing = {tools.ustr(external_id) for external_id in external_ids if external_id}
+        missing.difference_update(cache)
+        if missing:
+            self.to_internal_many(missing)
+
+    def to_internal(self, external_id, unwrap=False):
+        """ Give the Odoo recordset for an external ID, from the cache
+        of the session when the binding has been prefetched """
+        cache = self._bindings_cache()
+        if cache is None or tools.ustr(external_id) not in cache:
+            return super(EbayModelBinder, self).to_internal(external_id, unwrap=unwrap)
+        binding = self.model.browse(cache[tools.ustr(external_id)] or [])
+        if unwrap:
+            return binding[self._odoo_field]
+        return binding
+
+    def bind_many(self, bindings):
+        """ Create the links between the external ids and the Odoo ids
+        of many bindings, with one write of their sync date
+
+        :param bindings: list of ``(external_id, binding)``
+        """
+        records = self.model.browse()
+        for external_id, binding in bindings:
+            external_id = tools.ustr(external_id)
+            if binding[self._external_field] != external_id:
+                binding.with_context(connector_no_export=True).write(
+                    {self._external_field:external_id})
+            records |= binding
+        if not records:
+            return
+        records.with_context(connector_no_export=True).write(
+            {self._sync_date_field:fields.Datetime.now()})
+        cache = self._bindings_cache()
+        if cache is not None:
+            cache.update((tools.ustr(external_id), binding.id) for external_id, binding in bindings)
+
+    def bind(self, external_id, binding):
+        super(EbayModelBinder, self).bind(external_id, binding)
+        cache = self._bindings_cache()
+        if cache is not None:
+            if not isinstance(binding, models.BaseModel):
+                binding = self.model.browse(binding)
+            cache[tools.ustr(external_id)] = binding.id
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Instrumentation of the eBay API calls.
+
+``EbayAPI.call`` records every call in a per-process aggregator: count,
+latency histogram, size of the responses and error codes, by database,
+backend and eBay method. The adapters record the lookups in their
+response cache. The aggregates are flushed periodically to
+``ebay.api.stats`` by :meth:`ebay.backend._flush_api_stats`.
+
+"""
+
+import bisect
+import threading
+import time
+from collections import Counter
+
+# Upper bounds of the latency buckets, in milliseconds
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+STATS_FLUSH_INTERVAL = 60  # seconds
+
+
+class MethodStats(object):
+    """ Aggregated calls of an eBay method """
+
+    def __init__(self):
+        self.start = time.time()
+        self.count = 0
+        self.error_count = 0
+        self.error_codes = Counter()
+        self.latency_total = 0.
+        self.latency_max = 0.
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.bytes_total = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, latency, size=0, error_codes=None, failed=False):
+        latency_ms = latency * 1000.
+        self.count += 1
+        self.latency_total += latency_ms
+        self.latency_max = max(self.latency_max, latency_ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency_ms)] += 1
+        self.bytes_total += size or 0
+        if failed:
+            self.error_count += 1
+        for code in error_codes or ():
+            self.error_codes[code] += 1
+
+    def add_cache_lookup(self, hit):
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def percentile(self, quantile):
+        """ Upper bound of the bucket of the quantile, in milliseconds """
+        if not self.count:
+            return 0.
+        rank = quantile * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.latency_max)
+        return self.latency_max
+
+
+class ApiCallStats(object):
+    """ Per-process aggregator of the eBay calls """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._flushed_at = {}
+
+    def record(self, dbname, backend_id, method, latency, size=0, error_codes=None, failed=False):
+        key = (backend_id, method)
+        with self._lock:
+            stats = self._stats.setdefault(dbname, {})
+            if key not in stats:
+                stats[key] = MethodStats()
+            stats[key].add(latency, size=size, error_codes=error_codes, failed=failed)
+
+    def record_cache_lookup(self, dbname, backend_id, method, hit):
+        key = (backend_id, method)
+        with self._lock:
+            stats = self._stats.setdefault(dbname, {})
+            if key not in stats:
+                stats[key] = MethodStats()
+            stats[key].add_cache_lookup(hit)
+
+    def flush_due(self, dbname, interval=STATS_FLUSH_INTERVAL):
+        with self._lock:
+            if not self._stats.get(dbname):
+                return False
+            return time.time() - self._flushed_at.get(dbname, 0) >= interval
+
+    def pop(self, dbname):
+        """ Return the stats of a database by (backend_id, method) and
+        restart the aggregation """
+        with self._lock:
+            self._flushed_at[dbname] = time.time()
+            return self._stats.pop(dbname, {})
+
+
+api_call_stats = ApiCallStats()
@@ -23,6 +23,8 @@
 
 from odoo.addons.component.core import AbstractComponent
 
+from .import_profile import measure
+
 
 class BaseEbayConnectorComponent(AbstractComponent):
     """ Base eBay Connector Component
@@ -32,3 +34,14 @@ class BaseEbayConnectorComponent(AbstractComponent):
     _name = 'base.ebay.connector'
     _inherit = 'base.connector'
     _collection = 'ebay.backend'
+
+    def _import_profile(self):
+        """ Return the ImportProfile of the session, None when the
+        backend doesn't profile the imports """
+        cache = getattr(self.work, 'ebay_cache', None)
+        return cache.profile if cache is not None else None
+
+    def _measure(self, step):
+        """ Measure a step of the import when the backend profiles the
+        imports, see ``components/import_profile.py`` """
+        return measure(self._import_profile(), self._name, step, self.env.cr)
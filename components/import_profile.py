@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+"""
+
+Profile of the imports, enabled by ``import_profiling`` on the backend.
+
+The import mappers measure each step of the mapping of a record: the
+``direct`` mappings as a group, each ``@mapping`` method, each child and
+``finalize``, or the whole mapping (``map``) when the mapper is not
+compiled. The importers measure the creation and the update of the
+records in Odoo. The time and the number of SQL queries of each step are
+summed by component, the summary is added to the result of the job.
+
+The time of a step includes the steps it calls: the time of a child
+includes the steps of the mapper of the child.
+
+"""
+
+import time
+from contextlib import contextmanager
+
+PROFILE_SUMMARY_STEPS = 20
+
+
+class ImportProfile(object):
+    """ Time and SQL queries of the steps of an import """
+
+    def __init__(self):
+        # (component name, step): [calls, seconds, queries]
+        self.steps = {}
+
+    @contextmanager
+    def measure(self, component_name, step, cr):
+        queries = getattr(cr, 'sql_log_count', 0)
+        start = time.time()
+        try:
+            yield
+        finally:
+            stats = self.steps.setdefault((component_name, step), [0, 0., 0])
+            stats[0] += 1
+            stats[1] += time.time() - start
+            stats[2] += getattr(cr, 'sql_log_count', 0) - queries
+
+    def summary(self, limit=PROFILE_SUMMARY_STEPS):
+        """ Return the slowest steps, as text """
+        if not self.steps:
+            return None
+        steps = sorted(self.steps.items(), key=lambda item: item[1][1], reverse=True)
+        return 'profile: ' + ', '.join(
+            '%s.%s: %d calls %.3fs %d queries' % (component_name, step, calls, seconds, queries)
+            for (component_name, step), (calls, seconds, queries) in steps[:limit])
+
+
+@contextmanager
+def _not_measured():
+    yield
+
+
+def measure(profile, component_name, step, cr):
+    """ Measure a step in ``profile``, nothing when it is None """
+    if profile is None:
+        return _not_measured()
+    return profile.measure(component_name, step, cr)
@@ -36,16 +36,36 @@ are already bound, to update the last sync date.
 
 """
 
+import hashlib
+import json
 import logging
 
 from odoo import fields, _
-from odoo.addons.component.core import AbstractComponent
+from odoo.addons.component.core import AbstractComponent, Component
 from odoo.addons.connector.exception import IDMissingInBackend
-from odoo.addons.queue_job.exception import NothingToDoJob
+from odoo.addons.queue_job.exception import NothingToDoJob, RetryableJobError
+from odoo.addons.queue_job.job import identity_exact
+
+from .pipeline import ImportPipeline
 
 _logger = logging.getLogger(__name__)
 
 
+def payload_hash(data):
+    """ Return a stable hash of the eBay data of a record """
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class DeferredCreate(object):
+    """ A record to create, returned by :meth:`EbayImporter.run` when
+    the creation is deferred to the batch importer """
+
+    def __init__(self, importer, values):
+        self.importer = importer
+        self.values = values
+
+
 class EbayImporter(AbstractComponent):
     """ Base importer for eBay """
     _name = 'ebay.importer'
@@ -56,6 +76,7 @@ class EbayImporter(AbstractComponent):
         super(EbayImporter, self).__init__(work_context)
         self.external_id = None
         self.ebay_record = None
+        self.ebay_hash = None
 
     def _get_ebay_data(self):
         """ Return the raw eBay data for ``self.external_id`` """
@@ -64,14 +85,37 @@ class EbayImporter(AbstractComponent):
     def _before_import(self):
         """ Hook called before the import, when we have the eBay data"""
 
+    def _get_ebay_hash(self):
+        """ Return the hash of the eBay data, computed before the data
+        is modified by the import. The adapters only return the fields
+        used by the import, so their changes are the ones we care about """
+        if not self.ebay_record:
+            return None
+        cache = getattr(self.work, 'ebay_cache', None)
+        if cache is not None:
+            # hashed by the map stage of the pipelined import
+            computed = cache.payload_hashes.pop((self.model._name, str(self.external_id)), None)
+            if computed:
+                return computed
+        return payload_hash(self.ebay_record)
+
     def _is_uptodate(self, binding):
         """Return True if the import should be skipped because
         it is already up-to-date in Odoo
-        On eBay we haven't updated date"""
-        return False
+        On eBay we haven't updated date, the hash of the eBay data
+        is compared with the one of the last import"""
+        if not binding or not self.ebay_hash:
+            return False
+        return binding.ebay_hash == self.ebay_hash
+
+    def _count(self, event):
+        """ Count an event of the import in the cache of the session """
+        cache = getattr(self.work, 'ebay_cache', None)
+        if cache is not None:
+            cache.counters[(self.model._name, event)] += 1
 
     def _import_dependency(self, external_id, binding_model,
-                           importer=None, always=False):
+                           importer=None, always=False, ebay_record=None):
         """ Import a dependency.
 
         The importer class is a class or subclass of
@@ -89,21 +133,35 @@ class EbayImporter(AbstractComponent):
                        update. When False, it will import it only when
                        it does not yet exist.
         :type always: boolean
+        :param ebay_record: eBay data of the dependency, when it is
+                            already known, given to the importer
+        :type ebay_record: dict
+
+        A dependency is imported at most once by the session (the batch),
+        the next calls return without import.
         """
         if not external_id:
             return
+        cache = getattr(self.work, 'ebay_cache', None)
+        key = (binding_model, str(external_id))
+        if cache is not None and key in cache.dependencies:
+            return
         binder = self.binder_for(binding_model)
         if always or not binder.to_internal(external_id):
             if importer is None:
                 importer = self.component(usage='record.importer',
                                           model_name=binding_model)
+            if ebay_record is not None:
+                importer.ebay_record = ebay_record
             try:
                 importer.run(external_id)
             except NothingToDoJob:
                 _logger.info(
                     'Dependency import of %s(%s) has been ignored.',
-                    binding_model._name, external_id
+                    binding_model, external_id
                 )
+        if cache is not None:
+            cache.dependencies.add(key)
 
     def _import_dependencies(self):
         """ Import the dependencies for the record
@@ -174,10 +232,14 @@ class EbayImporter(AbstractComponent):
         """ Hook called at the end of the import """
         return
 
-    def run(self, external_id, force=False):
+    def run(self, external_id, force=False, defer_create=False):
         """ Run the synchronization
 
         :param external_id: identifier of the record on eBay
+        :param defer_create: when True, a new record is not created, a
+                             :class:`DeferredCreate` with its values is
+                             returned to the batch importer which creates
+                             the records of a page by chunks
         """
         self.external_id = external_id
         lock_name = 'import({}, {}, {}, {})'.format(
@@ -191,14 +253,17 @@ class EbayImporter(AbstractComponent):
             self.ebay_record = self._get_ebay_data()
         except IDMissingInBackend:
             return _('Record does no longer exist in eBay')
+        self.ebay_hash = self._get_ebay_hash()
 
         skip = self._must_skip()
         if skip:
+            self._count('skipped')
             return skip
 
         binding = self._get_binding()
 
         if not force and self._is_uptodate(binding):
+            self._count('uptodate')
             return _('Already up-to-date.')
 
         # Keep a lock on this import until the transaction is committed
@@ -208,16 +273,27 @@ class EbayImporter(AbstractComponent):
         self._before_import()
 
         # import the missing linked resources
-        self._import_dependencies()
+        with self._measure('dependencies'):
+            self._import_dependencies()
 
         map_record = self._map_data()
 
         if binding:
             record = self._update_data(map_record)
-            self._update(binding, record)
+            if self.ebay_hash:
+                record['ebay_hash'] = self.ebay_hash
+            with self._measure('update'):
+                self._update(binding, record)
+            self._count('updated')
         else:
             record = self._create_data(map_record)
-            binding = self._create(record)
+            if self.ebay_hash:
+                record['ebay_hash'] = self.ebay_hash
+            if defer_create:
+                return DeferredCreate(self, record)
+            with self._measure('create'):
+                binding = self._create(record)
+            self._count('created')
 
         self.binder.bind(self.external_id, binding)
 
@@ -236,11 +312,121 @@ class BatchImporter(AbstractComponent):
     _inherit = ['base.importer', 'base.ebay.connector']
     _usage = 'batch.importer'
 
-    def run(self, filters=None):
-        """ Run the synchronization """
-        record_ids = self.backend_adapter.search(filters)
-        for record_id in record_ids:
-            self._import_record(record_id)
+    def run(self, filters=None, checkpoint=None):
+        """ Run the synchronization
+
+        The search of the adapter follows the eBay pagination: the
+        records are imported while the next pages are not yet read.
+        When a page fails with a retryable error, the import of the
+        remaining pages is delayed in a new job starting at this page.
+
+        :param checkpoint: ``ebay.import.progress`` advanced and
+                           committed after each page, finished at the
+                           end of the search
+        """
+        page_number = None
+        self._pipeline = None
+        try:
+            for page_number, records in self._search_pages(filters):
+                records = list(records)
+                count = len(records)
+                last_record = records[-1] if records else None
+                self._prefetch_bindings(records)
+                self._import_page(records)
+                if checkpoint:
+                    last_external_id, last_date = self._checkpoint_values(last_record)
+                    checkpoint.advance(page_number, last_external_id, last_date, record_count=count)
+        except RetryableJobError as err:
+            page_number = getattr(err, 'page_number', page_number)
+            if not page_number:
+                raise
+            self._resume_from_page(filters, page_number, err, checkpoint=checkpoint)
+            return self._summary()
+        if checkpoint:
+            checkpoint.finish()
+        return self._summary()
+
+    def _checkpoint_values(self, record):
+        """ Return the external id and the eBay date of the last record
+        of a page, recorded by the checkpoint """
+        if isinstance(record, (list, tuple)):
+            return record[0], None
+        return record, None
+
+    def _use_pipeline(self):
+        """ Import the pages with the pipelined engine, see
+        ``components/pipeline.py`` """
+        return False
+
+    def _search_pages(self, filters):
+        """ Yield ``(page_number, records)`` for the pages to import """
+        adapter = self.backend_adapter
+        if not self._use_pipeline() or not adapter._record_list_path:
+            return adapter.search_pages(filters)
+        prefetch = adapter._prepare_search()
+        page_number = adapter._first_page_number(filters)
+        self._pipeline = ImportPipeline(
+            lambda: adapter._iter_pages(filters, page_number, prefetch=prefetch),
+            self._parse_page,
+        )
+        return self._pipeline.pages()
+
+    def _parse_page(self, page):
+        """ Map stage of the pipeline, run on its own thread: decode the
+        records of a page and hash their eBay data """
+        records = self.backend_adapter.parse_page(page)
+        cache = getattr(self.work, 'ebay_cache', None)
+        if cache is not None:
+            for record in records:
+                if isinstance(record, (list, tuple)):
+                    cache.payload_hashes[(self.model._name, str(record[0]))] = payload_hash(record[1])
+        return records
+
+    def _summary(self):
+        """ Return the counts of the records imported by the batch, as
+        result of the job """
+        cache = getattr(self.work, 'ebay_cache', None)
+        summary = []
+        if cache is not None and cache.counters:
+            summary.append(', '.join('%s %s: %d' % (model_name, event, count)
+                                     for (model_name, event), count in sorted(cache.counters.items())))
+        if getattr(self, '_pipeline', None):
+            summary.append(self._pipeline.summary())
+        if cache is not None and cache.profile is not None and cache.profile.steps:
+            summary.append(cache.profile.summary())
+        if not summary:
+            return None
+        summary = '; '.join(summary)
+        _logger.info('Import batch of %s: %s', self.model._name, summary)
+        return summary
+
+    def _resume_from_page(self, filters, page_number, error, checkpoint=None):
+        """ Delay the import of the search from ``page_number`` """
+        filters = dict(filters or {})
+        pagination = dict(filters.get('Pagination') or {})
+        pagination['PageNumber'] = page_number
+        filters['Pagination'] = pagination
+        _logger.info('Import of %s failed on page %s (%s), resumed in %s seconds',
+                     self.model._name, page_number, error, error.seconds)
+        description = '%s.import_batch from page %s' % (self.model._name, page_number)
+        delayable = self.model.with_delay(eta=error.seconds, description=description)
+        if checkpoint:
+            # the job finishes the window of the checkpoint
+            job = delayable.import_batch(self.backend_record, filters=filters, checkpoint=checkpoint)
+            checkpoint.wait(job_uuid=getattr(job, 'uuid', None))
+        else:
+            delayable.import_batch(self.backend_record, filters=filters)
+
+    def _prefetch_bindings(self, records):
+        """ Hook called with the records of a page before their import,
+        to load at once what the import of each record needs """
+        return
+
+    def _import_page(self, records):
+        """ Import the records of a page, dropping them once imported """
+        records.reverse()
+        while records:
+            self._import_record(records.pop())
 
     def _import_record(self, external_id):
         """ Import a record directly or delay the import of the record.
@@ -255,9 +441,102 @@ class DirectBatchImporter(AbstractComponent):
     _name = 'ebay.direct.batch.importer'
     _inherit = 'ebay.batch.importer'
 
-    def _import_record(self, external_id):
-        """ Import the record directly """
-        self.model.import_record(self.backend_record, external_id)
+    def _prefetch_bindings(self, records):
+        """ Resolve the bindings of the records of the page in one query,
+        the importers of the records are run in the same work context
+        and find them in its cache """
+        self.binder.prefetch(record[0] if isinstance(record, (list, tuple)) else record
+                             for record in records)
+
+    def _forget_bindings(self):
+        """ The rollback of a record may have removed bindings known
+        by the cache of the session """
+        cache = getattr(self.work, 'ebay_cache', None)
+        if cache is not None:
+            cache.clear_bindings()
+
+    def _import_record(self, external_id, defer_create=False):
+        """ Import the record directly
+
+        An error on a record is logged and doesn't stop the batch,
+        except the retryable errors of eBay which delay the batch.
+
+        :returns: a :class:`DeferredCreate` when ``defer_create`` is True
+                  and the record is new
+        """
+        try:
+            with self.env.cr.savepoint():
+                importer = self.component(usage='record.importer')
+                if defer_create:
+                    return importer.run(external_id, defer_create=True)
+                return importer.run(external_id)
+        except RetryableJobError:
+            self._forget_bindings()
+            raise
+        except Exception:
+            self._forget_bindings()
+            _logger.exception('Import of %s %s failed', self.model._name,
+                              external_id[0] if isinstance(external_id, (list, tuple)) else external_id)
+
+    def _get_create_chunk_size(self):
+        """ Number of new records created together, 0 to create each
+        record during its import """
+        return 0
+
+    def _import_page(self, records):
+        """ Import the records of a page
+
+        In the batch create mode, the records of the page are mapped
+        first, then the new ones are created by chunks.
+        """
+        chunk_size = self._get_create_chunk_size()
+        if chunk_size <= 0:
+            return super(DirectBatchImporter, self)._import_page(records)
+        pending = []
+        records.reverse()
+        while records:
+            result = self._import_record(records.pop(), defer_create=True)
+            if isinstance(result, DeferredCreate):
+                pending.append(result)
+            if len(pending) >= chunk_size:
+                self._create_chunk(pending)
+                pending = []
+        if pending:
+            self._create_chunk(pending)
+
+    def _create_records(self, pending):
+        """ Create the records, recompute their computed fields once and
+        bind them at once """
+        with self._measure('create chunk'):
+            with self.env.norecompute():
+                created = [(deferred.importer, deferred.importer._create(deferred.values))
+                           for deferred in pending]
+            self.model.recompute()
+        self.binder.bind_many([(importer.external_id, binding) for importer, binding in created])
+        for importer, binding in created:
+            importer._count('created')
+            importer._after_import(binding)
+
+    def _create_chunk(self, pending):
+        """ Create a chunk of records, or each record alone when the
+        creation of the chunk fails, to isolate the failing records """
+        try:
+            with self.env.cr.savepoint():
+                self._create_records(pending)
+            return
+        except RetryableJobError:
+            self._forget_bindings()
+            raise
+        except Exception:
+            self._forget_bindings()
+            if len(pending) == 1:
+                _logger.exception('Import of %s %s failed', self.model._name,
+                                  pending[0].importer.external_id)
+                return
+            _logger.warning('Creation of a chunk of %s %s failed, creating them one by one',
+                            len(pending), self.model._name, exc_info=True)
+        for deferred in pending:
+            self._create_chunk([deferred])
 
 
 class DelayedBatchImporter(AbstractComponent):
@@ -270,3 +549,56 @@ class DelayedBatchImporter(AbstractComponent):
         """ Delay the import of the records"""
         delayable = self.model.with_delay(**job_options or {})
         delayable.import_record(self.backend_record, external_id, **kwargs)
+
+
+class DelayedChunkBatchImporter(AbstractComponent):
+    """ Delay the import of the records by chunks
+
+    Each job imports a chunk of records, instead of one job by record.
+    The records of a chunk are imported by :class:`ChunkImporter`.
+    """
+
+    _name = 'ebay.delayed.chunk.batch.importer'
+    _inherit = 'ebay.batch.importer'
+
+    def _get_chunk_size(self):
+        return max(self.backend_record.import_chunk_size, 1)
+
+    def _import_page(self, records):
+        self._import_records(records)
+
+    def _import_records(self, records):
+        """ Delay one job by chunk of records """
+        chunk_size = self._get_chunk_size()
+        for start in range(0, len(records), chunk_size):
+            self._import_chunk(records[start:start + chunk_size])
+
+    def _import_chunk(self, records, job_options=None):
+        """ Delay the import of a chunk of records, the same chunk is
+        not delayed again while its job is pending """
+        first = records[0][0] if isinstance(records[0], (list, tuple)) else records[0]
+        options = {
+            'description':'%s.import_chunk: %d records from %s' % (self.model._name, len(records), first),
+            'identity_key':identity_exact,
+        }
+        options.update(job_options or {})
+        delayable = self.model.with_delay(**options)
+        delayable.import_chunk(self.backend_record, records)
+
+
+class ChunkImporter(Component):
+    """ Import the records of a chunk in the job of the chunk
+
+    An error on a record is logged and doesn't stop the others, each
+    record is imported in its own savepoint.
+    """
+
+    _name = 'ebay.chunk.importer'
+    _inherit = 'ebay.direct.batch.importer'
+    _usage = 'chunk.importer'
+
+    def run(self, records):
+        records = list(records)
+        self._prefetch_bindings(records)
+        self._import_page(records)
+        return self._summary()
@@ -3,7 +3,125 @@
 # © 2016 Sodexis
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import logging
+
+from odoo import tools
 from odoo.addons.component.core import AbstractComponent
+from odoo.addons.component.exception import NoComponentError
+from odoo.addons.connector.components.mapper import ImportMapper, external_to_m2o
+
+_logger = logging.getLogger(__name__)
+
+
+def compile_mapper(mapper):
+    """ Build the function mapping the records for the class of ``mapper``
+
+    The generic ``Mapper._apply_with_options`` resolves again for each
+    record the source of the ``direct`` mappings, the type of their
+    target fields and the ``@mapping`` methods. They are resolved once
+    here, the function returned fills the values in a single pass, in
+    the same order and with the same rules as the generic one.
+    """
+    direct = []
+    for from_attr, to_attr in mapper.direct:
+        if callable(from_attr):
+            direct.append((mapper._direct_source_field_name(from_attr), to_attr, from_attr))
+        else:
+            direct.append((from_attr, to_attr, None))
+    # modifier of the targets of the string sources, False for a value
+    # copied as is, resolved at the first value as ImportMapper._map_direct
+    # looks the field up only for a value (the target may not be a field)
+    relations = {}
+
+    def map_direct(mapper, source, attr_name, to_attr):
+        value = source.get(attr_name)
+        if not value:
+            return False
+        modifier = relations.get(to_attr)
+        if modifier is None:
+            if mapper.model._fields[to_attr].type == 'many2one':
+                # as ImportMapper._map_direct, the relation is a binding
+                modifier = external_to_m2o(attr_name)
+            else:
+                modifier = False
+            relations[to_attr] = modifier
+        if modifier:
+            return modifier(mapper, source, to_attr)
+        return value
+
+    methods = [(name, definition.changed_by, definition.only_create)
+               for name, definition in mapper._map_methods.items()]
+    children = list(mapper.children)
+
+    def apply(mapper, map_record):
+        profile = mapper._import_profile()
+        if profile is not None:
+            return apply_profiled(mapper, map_record, profile)
+        fields = mapper.options.fields
+        for_create = mapper.options.for_create
+        source = map_record.source
+        result = {}
+        for attr_name, to_attr, modifier in direct:
+            if fields and attr_name not in fields:
+                continue
+            if modifier is None:
+                result[to_attr] = map_direct(mapper, source, attr_name, to_attr)
+            else:
+                result[to_attr] = modifier(mapper, source, to_attr)
+        for name, changed_by, only_create in methods:
+            if fields and changed_by and not changed_by.intersection(fields):
+                continue
+            if only_create and not for_create:
+                continue
+            values = getattr(mapper, name)(source)
+            if not values:
+                continue
+            if not isinstance(values, dict):
+                raise ValueError('%s: invalid return value for the '
+                                 'mapping method %s' % (values, name))
+            result.update(values)
+        for from_attr, to_attr, model_name in children:
+            if not fields or from_attr in fields:
+                result[to_attr] = mapper._map_child(map_record, from_attr, to_attr, model_name)
+        return mapper.finalize(map_record, result)
+
+    def apply_profiled(mapper, map_record, profile):
+        """ ``apply`` measuring each step in the profile of the import """
+        fields = mapper.options.fields
+        for_create = mapper.options.for_create
+        source = map_record.source
+        name = mapper._name
+        cr = mapper.env.cr
+        result = {}
+        with profile.measure(name, 'direct', cr):
+            for attr_name, to_attr, modifier in direct:
+                if fields and attr_name not in fields:
+                    continue
+                if modifier is None:
+                    result[to_attr] = map_direct(mapper, source, attr_name, to_attr)
+                else:
+                    result[to_attr] = modifier(mapper, source, to_attr)
+        for method_name, changed_by, only_create in methods:
+            if fields and changed_by and not changed_by.intersection(fields):
+                continue
+            if only_create and not for_create:
+                continue
+            with profile.measure(name, method_name, cr):
+                values = getattr(mapper, method_name)(source)
+            if not values:
+                continue
+            if not isinstance(values, dict):
+                raise ValueError('%s: invalid return value for the '
+                                 'mapping method %s' % (values, method_name))
+            result.update(values)
+        for from_attr, to_attr, model_name in children:
+            if not fields or from_attr in fields:
+                with profile.measure(name, to_attr, cr):
+                    result[to_attr] = mapper._map_child(map_record, from_attr, to_attr, model_name)
+        with profile.measure(name, 'finalize', cr):
+            return mapper.finalize(map_record, result)
+
+    return apply
 
 
 class EbayImportMapper(AbstractComponent):
@@ -11,6 +129,83 @@ class EbayImportMapper(AbstractComponent):
     _inherit = ['base.ebay.connector', 'base.import.mapper']
     _usage = 'import.mapper'
 
+    # Keys of the records read by the @mapping methods, the modifiers of
+    # ``direct`` and the importer. A tuple ``(key, model_name)`` declares
+    # a sub-record mapped by the mapper of another model (a dependency)
+    _record_fields = []
+
+    @property
+    def reference_cache(self):
+        """ Cached lookups of the sales teams, currencies, countries and
+        states, see ``ebay.reference.cache`` """
+        return self.env['ebay.reference.cache']
+
+    def _apply_with_options(self, map_record):
+        """ Map the record with the compiled function of the mapper
+
+        With the option ``ebay_check_compiled_mappers`` of the Odoo
+        configuration file, the record is mapped by the generic mapper
+        too and the differences are logged, the generic values are kept.
+        The generic mapper of a class which can't be compiled is profiled
+        as a whole.
+        """
+        apply = self._compiled_mapper()
+        if apply is None:
+            with self._measure('map'):
+                return super(EbayImportMapper, self)._apply_with_options(map_record)
+        values = apply(self, map_record)
+        if tools.config.get('ebay_check_compiled_mappers'):
+            generic = super(EbayImportMapper, self)._apply_with_options(map_record)
+            if generic != values:
+                _logger.error('Compiled mapper %s differs from the generic mapper:\n'
+                              'compiled: %s\ngeneric: %s', self._name, values, generic)
+                return generic
+        return values
+
+    def _compiled_mapper(self):
+        """ Return the compiled function of the class of the mapper, None
+        when the class overrides ``_map_direct`` which it doesn't call """
+        cls = type(self)
+        if '_ebay_compiled_mapper' not in cls.__dict__:
+            if cls._map_direct is not ImportMapper._map_direct:
+                cls._ebay_compiled_mapper = None
+            else:
+                cls._ebay_compiled_mapper = compile_mapper(self)
+        return cls._ebay_compiled_mapper
+
+    def record_fields(self):
+        """ Return the keys of the records used by the mapper
+
+        They are the sources of ``direct`` and ``children`` and the
+        ``_record_fields``. The keys used by the mappers of the children
+        and of the dependencies are prefixed by the key of their
+        sub-record (``lines.sku``). The adapters request only these
+        fields to eBay.
+
+        :rtype: set
+        """
+        fields = set()
+        sub_records = []
+        for source in self._record_fields:
+            if isinstance(source, tuple):
+                sub_records.append(source)
+            else:
+                fields.add(source)
+        for source, __ in self.direct:
+            if isinstance(source, str) and source:
+                fields.add(source)
+        for source, __, model_name in self.children:
+            sub_records.append((source, model_name))
+        for source, model_name in sub_records:
+            try:
+                mapper = self.component(usage=self._usage, model_name=model_name)
+            except NoComponentError:
+                # unknown mapper, the whole sub-record is needed
+                fields.add(source)
+                continue
+            fields.update('%s.%s' % (source, field) for field in mapper.record_fields())
+        return fields
+
 
 class EbayExportMapper(AbstractComponent):
     _name = 'ebay.export.mapper'
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Pipelined import of the pages of a search.
+
+The import of a page has three stages: the eBay calls (fetch), the
+decoding of the pages in the data used by the importers (map) and the
+import in Odoo (write). :class:`ImportPipeline` runs the fetch and the
+map stages on their own threads, so the network, the CPU and the
+database work at the same time. The stages are linked by bounded
+queues: a stage waits when the next one is late, so at most a few pages
+are kept in memory.
+
+Only the write stage, run by the thread of the job, uses the ORM.
+
+"""
+
+import logging
+import threading
+import time
+
+from queue import Queue, Empty, Full
+
+_logger = logging.getLogger(__name__)
+
+PIPELINE_QUEUE_SIZE = 2  # pages waiting between two stages
+
+
+class StageStats(object):
+    """ Records processed by a stage and time spent processing them """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.busy = 0.
+
+    @property
+    def rate(self):
+        return self.count / self.busy if self.busy else 0.
+
+    def __str__(self):
+        return '%s: %d records in %.1fs (%.1f/s)' % (self.name, self.count, self.busy, self.rate)
+
+
+class _Failure(object):
+
+    def __init__(self, error):
+        self.error = error
+
+
+_DONE = object()
+
+
+class ImportPipeline(object):
+    """ Run the fetch and the map stages of an import on threads
+
+    :param fetch: callable returning an iterator of ``(page_number, page)``,
+                  called on the fetch thread
+    :param parse: callable returning the list of records of a page,
+                  called on the map thread
+    """
+
+    def __init__(self, fetch, parse, queue_size=PIPELINE_QUEUE_SIZE):
+        self.fetch = fetch
+        self.parse = parse
+        self.stats = [StageStats('fetch'), StageStats('map'), StageStats('write')]
+        self._pages = Queue(maxsize=queue_size)
+        self._records = Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+
+    def _put(self, queue, item):
+        """ Put an item in a queue, unless the pipeline is stopped """
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _get(self, queue):
+        while not self._stop.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                continue
+        return _DONE
+
+    def _fetch_stage(self):
+        fetch_stats = self.stats[0]
+        pages = None
+        try:
+            pages = iter(self.fetch())
+            while True:
+                start = time.time()
+                try:
+                    item = next(pages)
+                except StopIteration:
+                    break
+                fetch_stats.busy += time.time() - start
+                if not self._put(self._pages, item):
+                    return
+            self._put(self._pages, _DONE)
+        except BaseException as err:
+            self._put(self._pages, _Failure(err))
+        finally:
+            # stops the threads prefetching the pages
+            if hasattr(pages, 'close'):
+                pages.close()
+
+    def _map_stage(self):
+        fetch_stats, map_stats = self.stats[:2]
+        try:
+            while True:
+                item = self._get(self._pages)
+                if item is _DONE or isinstance(item, _Failure):
+                    self._put(self._records, item)
+                    return
+                page_number, page = item
+                start = time.time()
+                records = self.parse(page)
+                map_stats.busy += time.time() - start
+                map_stats.count += len(records)
+                fetch_stats.count += len(records)
+                del item, page
+                if not self._put(self._records, (page_number, records)):
+                    return
+        except BaseException as err:
+            self._put(self._records, _Failure(err))
+
+    def pages(self):
+        """ Yield ``(page_number, records)`` for each page, the time
+        spent by the caller between two pages is the write stage """
+        write_stats = self.stats[2]
+        threads = [threading.Thread(target=self._fetch_stage, name='ebay-import-fetch'),
+                   threading.Thread(target=self._map_stage, name='ebay-import-map')]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            while True:
+                item = self._get(self._records)
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                page_number, records = item
+                count = len(records)
+                start = time.time()
+                yield page_number, records
+                write_stats.busy += time.time() - start
+                write_stats.count += count
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            _logger.info('Import pipeline: %s', self.summary())
+
+    def summary(self):
+        return ', '.join(str(stats) for stats in self.stats)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Rate limiter of the eBay API calls.
+
+All the processes (cron, queue job workers) calling eBay for a backend
+share a token bucket per API method, stored in ``ebay_api_quota``. The
+buckets are read and updated in their own short transaction, so the
+calls done by the other workers are seen immediately.
+
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+import odoo
+from odoo.addons.queue_job.exception import RetryableJobError
+
+_logger = logging.getLogger(__name__)
+
+# Above this delay, the job is retried later instead of waiting
+RATE_LIMIT_MAX_SLEEP = 10  # seconds
+
+
+class EbayRateLimiter(object):
+
+    def __init__(self, dbname, backend_id, burst, rate, daily_limit):
+        """
+        :param dbname: database of the backend
+        :param backend_id: id of the eBay backend
+        :param burst: default size of the buckets
+        :param rate: default number of calls per second
+        :param daily_limit: default number of calls per day, 0 for no limit
+        """
+        self._dbname = dbname
+        self._backend_id = backend_id
+        self._defaults = {
+            'burst':max(burst, 1),
+            'rate':rate,
+            'daily_limit':daily_limit,
+        }
+
+    def _create_bucket(self, cr, method, now):
+        cr.execute("""
+            INSERT INTO ebay_api_quota
+                (backend_id, method, burst, rate, daily_limit, tokens,
+                 refilled_at, day, daily_count,
+                 create_uid, create_date, write_uid, write_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0,
+                    %s, now() at time zone 'UTC',
+                    %s, now() at time zone 'UTC')
+            ON CONFLICT (backend_id, method) DO NOTHING
+        """, (self._backend_id, method, self._defaults['burst'],
+              self._defaults['rate'], self._defaults['daily_limit'],
+              self._defaults['burst'], now, datetime.utcnow().date(),
+              odoo.SUPERUSER_ID, odoo.SUPERUSER_ID))
+
+    def _select_bucket(self, cr, method):
+        cr.execute("""
+            SELECT id, burst, rate, daily_limit, tokens, refilled_at,
+                   day, daily_count
+            FROM ebay_api_quota
+            WHERE backend_id = %s AND method = %s
+            FOR UPDATE
+        """, (self._backend_id, method))
+        return cr.fetchone()
+
+    def _take(self, method):
+        """ Take a token in the bucket of the method
+
+        :returns: 0 if the call can be done, else the number of seconds
+                  to wait before a token is available
+        """
+        now = time.time()
+        today = datetime.utcnow().date()
+        with odoo.registry(self._dbname).cursor() as cr:
+            row = self._select_bucket(cr, method)
+            if not row:
+                self._create_bucket(cr, method, now)
+                row = self._select_bucket(cr, method)
+            return self._update_bucket(cr, row, now, today)
+
+    def _update_bucket(self, cr, row, now, today):
+        quota_id, burst, rate, daily_limit, tokens, refilled_at, day, daily_count = row
+        burst = max(burst or 1, 1)
+        if day != today:
+            day, daily_count = today, 0
+        # the rate is positive (constraints of the quotas and backends)
+        tokens = min(float(burst), (tokens or 0.) + max(now - (refilled_at or now), 0.) * rate)
+        wait = 0
+        if daily_limit and daily_count >= daily_limit:
+            tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time())
+            wait = (tomorrow - datetime.utcnow()).total_seconds()
+        elif tokens < 1:
+            wait = (1 - tokens) / rate
+        else:
+            tokens -= 1
+            daily_count += 1
+        cr.execute("""
+            UPDATE ebay_api_quota
+            SET tokens = %s, refilled_at = %s, day = %s, daily_count = %s,
+                write_date = now() at time zone 'UTC'
+            WHERE id = %s
+        """, (tokens, now, day, daily_count, quota_id))
+        return wait
+
+    def acquire(self, method):
+        """ Wait until a call of the method is allowed
+
+        Short waits are done in the process. When the quota is exhausted
+        for longer, a :class:`RetryableJobError` postpones the job
+        before eBay refuses the call.
+        """
+        while True:
+            wait = self._take(method)
+            if not wait:
+                return
+            if wait > RATE_LIMIT_MAX_SLEEP:
+                _logger.info('eBay quota of %s exhausted for backend %s, '
+                             'retry in %d seconds', method, self._backend_id, wait)
+                raise RetryableJobError(
+                    'The eBay call quota of %s is exhausted. The job will be '
+                    'retried later.' % method,
+                    seconds=int(wait) + 1, ignore_retry=True)
+            time.sleep(wait)
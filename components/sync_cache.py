@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Cache shared by the components of a synchronization.
+
+``ebay.backend.work_on`` creates one :class:`SyncCache` and propagates it
+to all the components of the session as ``work.ebay_cache``. It lives
+as long as the session, in the transaction of the job, so it only keeps
+data which is valid in this transaction.
+
+"""
+
+from collections import Counter
+
+
+class SyncCache(object):
+    """ Data shared by the importers, binders and mappers of a session """
+
+    def __init__(self):
+        # model name: {external id: binding id, or False if not bound}
+        self.bindings = {}
+        # (binding model, external id) of the dependencies already
+        # imported by the session
+        self.dependencies = set()
+        # (model name, external id): hash of the eBay data computed by
+        # the map stage of the pipelined import
+        self.payload_hashes = {}
+        # (model name, event): count, e.g. the records skipped because
+        # their eBay data has not changed
+        self.counters = Counter()
+        # ImportProfile of the session when the backend profiles the
+        # imports, see ``components/import_profile.py``
+        self.profile = None
+
+    def clear_bindings(self):
+        """ Forget the bindings and the dependencies, e.g. after the
+        rollback of a savepoint which may have created some of them """
+        self.bindings.clear()
+        self.dependencies.clear()
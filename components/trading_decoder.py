@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Streaming decoder of the Trading API responses.
+
+``ebaysdk`` builds the whole tree of a response and copies it into
+nested dicts, which takes several times the size of the payload for
+the large pages of ``GetOrders`` or ``GetSellerList``. The decoder
+reads the raw response with ``iterparse``, emits the records (orders,
+items) one at a time with the same structure as the dicts of
+``ebaysdk`` and frees the elements already read.
+
+This module only depends on lxml, so it can be benchmarked outside of
+Odoo (see ``scripts/benchmark_trading_decoder.py``).
+
+"""
+
+from io import BytesIO
+
+from lxml import etree
+
+# Top level nodes of the responses read before the records
+HEADER_TAGS = ('Ack', 'Errors', 'PaginationResult')
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+def element_to_dict(element):
+    """ Convert an element like ``ebaysdk`` does for a response
+
+    The namespaces are removed, the attributes are prefixed by ``_``,
+    the text of a node with attributes is in ``value`` and the repeated
+    nodes are lists.
+    """
+    children = [child for child in element if isinstance(child.tag, str)]
+    result = {} if element.attrib else None
+    if children:
+        grouped = {}
+        for child in children:
+            grouped.setdefault(_local_name(child.tag), []).append(element_to_dict(child))
+        result = dict((key, values[0] if len(values) == 1 else values)
+                      for key, values in grouped.items())
+    if element.attrib:
+        result.update(('_' + key, value) for key, value in element.attrib.items())
+    if element.text:
+        text = element.text.strip()
+        if children or element.attrib:
+            if text:
+                result['value'] = text
+        else:
+            result = text
+    return result
+
+
+def _free(element):
+    """ Clear an element and the siblings already read before it """
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def read_ack(content):
+    """ Return the ``Ack`` of a response, reading only its beginning """
+    for __, element in etree.iterparse(BytesIO(content), events=('end',), tag='{*}Ack'):
+        return (element.text or '').strip()
+    return None
+
+
+class TradingResponsePage(object):
+    """ A page of a Trading API search, decoded lazily
+
+    :param content: raw XML of the response
+    :param record_path: path of the records, e.g. ``('OrderArray', 'Order')``
+    :param header_tags: top level nodes needed before the records, like
+                        ``HasMoreOrders``
+    """
+
+    def __init__(self, content, record_path, header_tags=()):
+        self._content = content
+        self._container_tag, self._record_tag = record_path
+        self._header_tags = set(HEADER_TAGS).union(header_tags)
+        self._header = None
+
+    def _scan_header(self):
+        """ Read the top level nodes, stop at the records when all the
+        nodes needed have been read """
+        header = {}
+        required = self._header_tags - {'Errors'}
+        skipping = False
+        context = etree.iterparse(BytesIO(self._content), events=('start', 'end'))
+        for event, element in context:
+            if not isinstance(element.tag, str):
+                continue
+            parent = element.getparent()
+            if parent is None or parent.getparent() is not None:
+                # root or nested nodes
+                if skipping and event == 'end' and parent is not None \
+                        and _local_name(parent.tag) == self._container_tag:
+                    _free(element)
+                continue
+            name = _local_name(element.tag)
+            if name == self._container_tag:
+                if event == 'start':
+                    if required.issubset(header):
+                        break
+                    skipping = True
+                continue
+            if event == 'end':
+                if name in self._header_tags:
+                    value = element_to_dict(element)
+                    if name in header:
+                        if not isinstance(header[name], list):
+                            header[name] = [header[name]]
+                        header[name].append(value)
+                    else:
+                        header[name] = value
+                _free(element)
+        del context
+        return header
+
+    @property
+    def header(self):
+        if self._header is None:
+            self._header = self._scan_header()
+        return self._header
+
+    def get(self, key, default=None):
+        """ Read a top level node, like on the dict of a response """
+        return self.header.get(key, default)
+
+    def records(self):
+        """ Yield the records of the page one at a time """
+        context = etree.iterparse(BytesIO(self._content), events=('end',),
+                                  tag='{*}%s' % self._record_tag, huge_tree=True)
+        for __, element in context:
+            parent = element.getparent()
+            if parent is None or _local_name(parent.tag) != self._container_tag:
+                continue
+            record = element_to_dict(element)
+            _free(element)
+            yield record
+        del context
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Planning of the windows of time of the order searches.
+
+A long range of time (e.g. after a downtime) is split in windows sized
+to hold about ``target`` records, from the density of records (records
+by hour) observed by the previous imports. The density is updated with
+the number of records actually found in each window, so the next
+windows shrink or widen.
+
+"""
+
+from datetime import timedelta
+
+WINDOW_TARGET_RECORDS = 1000
+WINDOW_MIN_SPAN = timedelta(minutes=5)
+# eBay limits the ranges of the searches of GetOrders
+WINDOW_MAX_SPAN = timedelta(days=30)
+WINDOW_INITIAL_SPAN = timedelta(days=1)
+# weight of the last window in the density
+WINDOW_DENSITY_SMOOTHING = 0.5
+
+
+class WindowPlanner(object):
+    """ Split a range of time in windows of about ``target`` records
+
+    :param density: records by hour observed before, None if unknown
+    """
+
+    def __init__(self, density=None, target=WINDOW_TARGET_RECORDS,
+                 min_span=WINDOW_MIN_SPAN, max_span=WINDOW_MAX_SPAN,
+                 initial_span=WINDOW_INITIAL_SPAN):
+        self.density = density or None
+        self.target = max(target, 1)
+        self.min_span = min_span
+        self.max_span = max_span
+        self.initial_span = initial_span
+
+    def span(self):
+        if not self.density:
+            span = self.initial_span
+        else:
+            span = timedelta(seconds=int(3600. * self.target / self.density))
+        return min(max(span, self.min_span), self.max_span)
+
+    def next_window(self, start, end):
+        """ Return the ``(date_from, date_to)`` of the window starting
+        at ``start``, not after ``end`` """
+        date_to = min(start + self.span(), end)
+        # don't leave a window smaller than the minimum at the end,
+        # unless the merged window would exceed the maximum
+        if end - date_to < self.min_span and end - start <= self.max_span:
+            date_to = end
+        return start, date_to
+
+    def observe(self, date_from, date_to, count):
+        """ Update the density with the records found in a window """
+        hours = (date_to - date_from).total_seconds() / 3600.
+        if hours <= 0:
+            return self.density
+        # an empty window counts as half a record, so the windows
+        # widen progressively on quiet periods
+        observed = max(count, 0.5) / hours
+        if not self.density:
+            self.density = observed
+        else:
+            self.density = (WINDOW_DENSITY_SMOOTHING * observed +
+                            (1 - WINDOW_DENSITY_SMOOTHING) * self.density)
+        return self.density
+
+    def windows(self, start, end):
+        """ Yield the windows between ``start`` and ``end``, the caller
+        calls :meth:`observe` after the import of each window """
+        while start < end:
+            date_from, date_to = self.next_window(start, end)
+            yield date_from, date_to
+            start = date_to
@@ -3,8 +3,18 @@
 # © 2016 Sodexis
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from openerp.addons.connector.exception import RetryableJobError
+from odoo.addons.connector.exception import RetryableJobError
+from odoo.addons.queue_job.exception import FailedJobError
 
 
 class OrderImportRuleRetry(RetryableJobError):
     """ The sale order import will be retried later. """
+
+
+class EbayRetryableError(RetryableJobError):
+    """ Transient or throttling error of the eBay API, the call will be
+    retried later. """
+
+
+class EbayFailedError(FailedJobError):
+    """ Permanent error of the eBay API, retrying the call is useless. """
@@ -21,6 +21,12 @@
 ##############################################################################
 
 from . import ebay_backend
+from . import api_quota
+from . import api_stats
+from . import import_checkpoint
+from . import order_backfill
+from . import reference_cache
 from . import ebay_binding
+from . import partner
 from . import sale_order
 from . import product
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import logging
+from datetime import datetime
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class EbayApiQuota(models.Model):
+    """ Call quota of an eBay API method for a backend
+
+    The rows are the buckets of the rate limiter shared by all the
+    processes calling eBay (see ``components/rate_limiter.py``), they
+    are created on the first call of a method.
+    """
+    _name = 'ebay.api.quota'
+    _description = 'eBay API call quota'
+    _order = 'backend_id, method'
+
+    backend_id = fields.Many2one(
+        comodel_name='ebay.backend',
+        string='eBay Backend',
+        required=True,
+        ondelete='cascade',
+    )
+    method = fields.Char('API method', required=True, readonly=True)
+    burst = fields.Integer('Burst', help='Number of calls which can be done at once.')
+    rate = fields.Float('Calls per second', required=True, help='Sustained rate of the calls.')
+    daily_limit = fields.Integer('Daily limit', help='Number of calls allowed per day (UTC), 0 for no limit.')
+    tokens = fields.Float('Available calls', readonly=True)
+    refilled_at = fields.Float('Refill timestamp', readonly=True)
+    day = fields.Date('Day', readonly=True)
+    daily_count = fields.Integer('Calls today', readonly=True)
+    remaining_today = fields.Integer('Remaining calls today', compute='_compute_remaining_today')
+
+    _sql_constraints = [
+        ('backend_method_uniq', 'unique(backend_id, method)',
+         'A quota already exists for this method.'),
+        ('rate_positive', 'CHECK(rate > 0)',
+         'The rate of the calls must be positive.'),
+    ]
+
+    @api.depends('daily_limit', 'daily_count', 'day')
+    def _compute_remaining_today(self):
+        today = fields.Date.to_string(datetime.utcnow().date())
+        for quota in self:
+            count = quota.daily_count if quota.day == today else 0
+            if quota.daily_limit:
+                quota.remaining_today = max(quota.daily_limit - count, 0)
+            else:
+                quota.remaining_today = 0
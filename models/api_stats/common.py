@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import json
+from datetime import datetime
+
+from odoo import models, fields, api
+
+
+class EbayApiStats(models.Model):
+    """ Calls of an eBay method by a backend during a period
+
+    The calls are aggregated in memory by each process and flushed
+    periodically (see ``components/call_stats.py``).
+    """
+    _name = 'ebay.api.stats'
+    _description = 'eBay API call statistics'
+    _order = 'date_start desc, backend_id, method'
+
+    backend_id = fields.Many2one(
+        comodel_name='ebay.backend',
+        string='eBay Backend',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    method = fields.Char('API method', required=True, index=True)
+    date_start = fields.Datetime('From', required=True, index=True)
+    date_end = fields.Datetime('To', required=True)
+    call_count = fields.Integer('Calls')
+    error_count = fields.Integer('Errors')
+    error_codes = fields.Char('Error codes', help='Number of errors by eBay error code.')
+    latency_avg = fields.Float('Average latency (ms)', group_operator='avg')
+    latency_p50 = fields.Float('Latency p50 (ms)', group_operator='avg')
+    latency_p90 = fields.Float('Latency p90 (ms)', group_operator='avg')
+    latency_p99 = fields.Float('Latency p99 (ms)', group_operator='avg')
+    latency_max = fields.Float('Max latency (ms)', group_operator='max')
+    bytes_total = fields.Integer('Bytes received')
+    cache_hits = fields.Integer('Cache hits', help='Calls answered by the response cache.')
+    cache_misses = fields.Integer('Cache misses')
+
+    @api.model
+    def _values_from_stats(self, backend_id, method, stats, end):
+        return {
+            'backend_id':backend_id,
+            'method':method,
+            'date_start':fields.Datetime.to_string(datetime.utcfromtimestamp(stats.start)),
+            'date_end':fields.Datetime.to_string(datetime.utcfromtimestamp(end)),
+            'call_count':stats.count,
+            'error_count':stats.error_count,
+            'error_codes':json.dumps(dict(stats.error_codes), sort_keys=True) if stats.error_codes else False,
+            'latency_avg':stats.latency_total / stats.count if stats.count else 0.,
+            'latency_p50':stats.percentile(0.5),
+            'latency_p90':stats.percentile(0.9),
+            'latency_p99':stats.percentile(0.99),
+            'latency_max':stats.latency_max,
+            'bytes_total':stats.bytes_total,
+            'cache_hits':stats.cache_hits,
+            'cache_misses':stats.cache_misses,
+        }
@@ -34,19 +34,12 @@ class CategoryBatchImporter(Component):
 
     """
     _name = 'ebay.category.batch.importer'
-    _inherit = 'ebay.delayed.batch.importer'
+    _inherit = 'ebay.delayed.chunk.batch.importer'
     _apply_on = 'ebay.config.product.category'
 
     def run(self, filters=None):
         categories = self.backend_adapter.get_all_categories(filters)
-        for category in categories:
-            category_binding_model = self.env['ebay.config.product.category']
-            delayable = category_binding_model.with_delay()
-            delayable.description = '%s.import_record: %s' % (category_binding_model._name, category.json())
-            delayable.import_record(self.backend_record, category)
-        import wdb
-        wdb.set_trace()
-        return
+        self._import_records(list(categories))
 
 
 class CategoryImporter(Component):
@@ -21,17 +21,29 @@
 ##############################################################################
 
 import logging
+import time
 from datetime import datetime, timedelta
 
 from decorator import contextmanager
-from odoo import models, fields, api, _
+from odoo import models, fields, api, registry, SUPERUSER_ID, _
 
 from ...components.backend_adapter import EbayAPI
+from ...components.call_stats import api_call_stats
+from ...components.import_profile import ImportProfile
+from ...components.sync_cache import SyncCache
+from ...components.window_planner import WindowPlanner
+from ..import_checkpoint.common import CHECKPOINT_STREAMS
 
 _logger = logging.getLogger(__name__)
 
 IMPORT_DELTA_BUFFER = 120  # seconds
 
+# Changing one of these fields invalidates the pooled API connections
+EBAY_CONNECTION_FIELDS = (
+    'client_id', 'dev_id', 'client_secret', 'token',
+    'api_mode', 'api_fake_url', 'api_fixture_path',
+)
+
 
 class EbayBackend(models.Model):
     _name = 'ebay.backend'
@@ -67,10 +79,77 @@ class EbayBackend(models.Model):
 
     import_sales_from_date = fields.Datetime(
         string='Import sales from date',
+        help='The orders created or modified on eBay after this date are '
+             'imported by the next import.',
     )
 
-    import_updated_sales_from_date = fields.Datetime(
-        string='Import updated sales from date',
+    order_prefetch_pages = fields.Integer(
+        string='Order pages prefetched',
+        help="Number of pages of orders downloaded in parallel while "
+             "the current page is imported. 0 downloads the pages one "
+             "after the other.",
+        default=0,
+    )
+    order_window_size = fields.Integer(
+        string='Orders by search window',
+        help="The time since the last import is split in windows which "
+             "should hold about this number of orders, from the number "
+             "of orders found by the previous imports.",
+        default=1000,
+    )
+    order_import_pipeline = fields.Boolean(
+        string='Pipelined order import',
+        help="Download, decode and import the pages of orders at the same "
+             "time, on separate threads.",
+        default=False,
+    )
+    import_profiling = fields.Boolean(
+        string='Profile the imports',
+        help="Measure the time and the SQL queries of each step of the "
+             "mapping and of the creation of the imported records, the "
+             "slowest steps are added to the result of the import jobs.",
+        default=False,
+    )
+    import_chunk_size = fields.Integer(
+        string='Records by import job',
+        help="Number of records imported by each job of the imports "
+             "delayed by chunks.",
+        default=100,
+    )
+    order_create_chunk_size = fields.Integer(
+        string='Orders created together',
+        help="Number of new orders of a page created together, their "
+             "totals are computed once by chunk. 0 creates each order "
+             "when it is imported.",
+        default=0,
+    )
+
+    api_call_burst = fields.Integer(
+        string='API calls burst',
+        help="Number of eBay calls of a method which can be done at once.",
+        default=10,
+    )
+    api_call_rate = fields.Float(
+        string='API calls per second',
+        help="Sustained rate of the eBay calls of a method.",
+        default=2.0,
+    )
+    api_daily_call_limit = fields.Integer(
+        string='API daily call limit',
+        help="Number of eBay calls of a method allowed per day, "
+             "0 for no limit.",
+        default=5000,
+    )
+    import_checkpoint_ids = fields.One2many(
+        comodel_name='ebay.import.checkpoint',
+        inverse_name='backend_id',
+        string='Import checkpoints',
+        readonly=True,
+    )
+    api_quota_ids = fields.One2many(
+        comodel_name='ebay.api.quota',
+        inverse_name='backend_id',
+        string='API call quotas',
     )
 
     sale_prefix = fields.Char(
@@ -109,11 +188,41 @@ class EbayBackend(models.Model):
 
     prod_environment = fields.Boolean("Environment", help="Set to True if your credentials are certified for production.")
 
+    api_mode = fields.Selection(
+        selection=[('live', 'eBay'),
+                   ('record', 'eBay, recording the responses'),
+                   ('replay', 'Recorded responses'),
+                   ('fake', 'Fake server')],
+        string='API mode',
+        required=True,
+        default='live',
+        help="Record saves the responses of eBay in the fixture directory, "
+             "replay answers the calls with them without calling eBay. "
+             "The fake server is scripts/fake_trading_server.py.",
+    )
+    api_fake_url = fields.Char(
+        string='Fake server address',
+        help="host:port of the fake Trading API server.",
+        default='localhost:8765',
+    )
+    api_fixture_path = fields.Char(
+        string='Fixture directory',
+        help="Directory of the recorded eBay responses.",
+    )
+
     _sql_constraints = [
         ('sale_prefix_uniq', 'unique(sale_prefix)',
-         "A backend with the same sale prefix already exists")
+         "A backend with the same sale prefix already exists"),
+        ('api_call_rate_positive', 'CHECK(api_call_rate > 0)',
+         "The rate of the eBay calls must be positive"),
     ]
 
+    def write(self, vals):
+        res = super(EbayBackend, self).write(vals)
+        if set(vals).intersection(EBAY_CONNECTION_FIELDS):
+            EbayAPI.evict_connections(self)
+        return res
+
     def toggle_prod_environment(self):
         for c in self:
             c.prod_environment = not c.prod_environment
@@ -128,40 +237,135 @@ class EbayBackend(models.Model):
         with EbayAPI(self) as ebay_api:
             _super = super(EbayBackend, self)
             # from the components we'll be able to do: self.work.ebay_api
-            with _super.work_on(
-                    model_name, ebay_api=ebay_api, **kwargs) as work:
-                yield work
+            # and share data of the session in self.work.ebay_cache
+            if 'ebay_cache' not in kwargs:
+                kwargs['ebay_cache'] = SyncCache()
+                if self.import_profiling:
+                    kwargs['ebay_cache'].profile = ImportProfile()
+            try:
+                with _super.work_on(
+                        model_name, ebay_api=ebay_api, **kwargs) as work:
+                    yield work
+            finally:
+                if api_call_stats.flush_due(self.env.cr.dbname):
+                    self._flush_api_stats()
+
+    @api.model
+    def _flush_api_stats(self):
+        """ Store the statistics of the eBay calls done by this process
+
+        They are stored in their own transaction, so the calls of a
+        failed job are counted too.
+        """
+        dbname = self.env.cr.dbname
+        stats = api_call_stats.pop(dbname)
+        if not stats:
+            return
+        end = time.time()
+        try:
+            with registry(dbname).cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                backend_ids = set(env['ebay.backend'].browse(
+                    list({backend_id for backend_id, _method in stats})).exists().ids)
+                model = env['ebay.api.stats']
+                for (backend_id, method), method_stats in stats.items():
+                    if backend_id in backend_ids:
+                        model.create(model._values_from_stats(backend_id, method, method_stats, end))
+        except Exception:
+            _logger.exception('The statistics of the eBay calls could not be stored')
+
+    def _get_sale_binding_model(self):
+        self.ensure_one()
+        user = self.warehouse_id.company_id.user_tech_id
+        if not user:
+            user = self.env['res.users'].browse(self.env.uid)
+        sale_binding_model = self.env['ebay.sale.order']
+        if user != self.env.user:
+            sale_binding_model = sale_binding_model.sudo(user)
+        return sale_binding_model
+
+    def _import_order_stream(self, stream, import_start_time, import_end_time, update_import_date=True):
+        """ Import the orders of a stream ('created' or 'modified')
+
+        The range of time is split in windows by a
+        :class:`~odoo.addons.connector_ebay.components.window_planner.WindowPlanner`,
+        each window is imported by its own batch.
+
+        With ``update_import_date``, the import goes through the checkpoint
+        of the stream: a window interrupted by a crash is resumed from its
+        last committed page before a new window is started, and the
+        watermark of the backend is moved once each window is imported.
+        """
+        self.ensure_one()
+        sale_binding_model = self._get_sale_binding_model()
+        checkpoint = self.env['ebay.import.checkpoint'].for_stream(self, stream)
+        planner = WindowPlanner(density=checkpoint.order_density, target=self.order_window_size)
+        if not update_import_date:
+            key_from, key_to, __ = CHECKPOINT_STREAMS[stream]
+            for date_from, date_to in planner.windows(import_start_time, import_end_time):
+                sale_binding_model.import_batch(self, filters={key_from:date_from.isoformat(),
+                                                               key_to:date_to.isoformat()})
+            return
+        if checkpoint.state == 'waiting' and checkpoint._has_live_job():
+            # a job is importing the rest of the window
+            return
+        if checkpoint.state in ('running', 'waiting'):
+            # resume the window interrupted by the last import, or whose
+            # job has failed or has been cancelled
+            if not self._import_order_window(sale_binding_model, checkpoint, planner):
+                return
+            import_start_time = max(import_start_time, fields.Datetime.from_string(checkpoint.date_to))
+        if import_start_time >= import_end_time:
+            __, __, watermark = CHECKPOINT_STREAMS[stream]
+            if not self[watermark]:
+                self.write({watermark:import_end_time})
+            return
+        for date_from, date_to in planner.windows(import_start_time, import_end_time):
+            checkpoint.start(date_from, date_to)
+            if not self._import_order_window(sale_binding_model, checkpoint, planner):
+                return
+
+    def _import_order_window(self, sale_binding_model, checkpoint, planner):
+        """ Import the window of a checkpoint, update the density of the
+        orders with the orders found
+
+        :returns: True when the window has been imported, False when the
+                  end of the window has been delayed in a job
+        """
+        sale_binding_model.import_batch(self, filters=checkpoint.filters(), checkpoint=checkpoint)
+        if checkpoint.state != 'done':
+            return False
+        planner.observe(fields.Datetime.from_string(checkpoint.date_from),
+                        fields.Datetime.from_string(checkpoint.date_to),
+                        checkpoint.record_count)
+        checkpoint.order_density = planner.density
+        return True
 
     def _import_sale_orders(self,
                             import_start_time=None,
                             import_end_time=None,
                             update_import_date=True):
-        for backend in self:
-            user = backend.warehouse_id.company_id.user_tech_id
-            if not user:
-                user = self.env['res.users'].browse(self.env.uid)
+        """ Import the orders created or modified since the last import
 
-            if not backend.import_updated_sales_from_date:
-                backend.import_updated_sales_from_date = backend.import_sales_from_date
-
-            if not import_end_time:
-                import_end_time = datetime.strptime(datetime.today().strftime('%Y-%m-%d %H:%M:%S'), '%Y-%m-%d %H:%M:%S') - timedelta(minutes=2)
+        The orders are searched by their date of modification only: an
+        order is modified when it is created, so the new orders and the
+        updated ones come in the same stream. The importer creates or
+        updates each order depending on its binding.
+        """
+        for backend in self:
+            end_time = import_end_time
+            if not end_time:
+                end_time = datetime.strptime(datetime.today().strftime('%Y-%m-%d %H:%M:%S'), '%Y-%m-%d %H:%M:%S') - timedelta(minutes=2)
 
             # If the start date to get sales is empty we put now as date
-            if not import_start_time:
+            start_time = import_start_time
+            if not start_time:
                 if backend.import_sales_from_date:
-                    import_start_time = datetime.strptime(backend.import_sales_from_date, '%Y-%m-%d %H:%M:%S')
+                    start_time = datetime.strptime(backend.import_sales_from_date, '%Y-%m-%d %H:%M:%S')
                 else:
-                    import_start_time = import_end_time
+                    start_time = end_time
 
-                sale_binding_model = self.env['ebay.sale.order']
-                if user != self.env.user:
-                    sale_binding_model = sale_binding_model.sudo(user)
-                filters = {'CreateTimeFrom':import_start_time.isoformat(), 'CreateTimeTo':import_end_time.isoformat()}
-                sale_binding_model.import_batch(backend, filters=filters)
-
-            if update_import_date:
-                backend.write({'import_sales_from_date':import_end_time})
+            backend._import_order_stream('modified', start_time, end_time, update_import_date=update_import_date)
 
         return True
 
@@ -169,28 +373,11 @@ class EbayBackend(models.Model):
                               import_start_time=None,
                               import_end_time=None,
                               update_import_date=True):
-
-        for backend in self:
-            user = backend.warehouse_id.company_id.user_tech_id
-            if not user:
-                user = self.env['res.users'].browse(self.env.uid)
-            sale_binding_model = self.env['ebay.sale.order']
-            if user != self.env.user:
-                sale_binding_model = sale_binding_model.sudo(user)
-
-            if not import_end_time:
-                # We minus two minutes to now time
-                import_end_time = datetime.strptime(datetime.today().strftime('%Y-%m-%d %H:%M:%S'), '%Y-%m-%d %H:%M:%S') - timedelta(minutes=2)
-            if not import_start_time:
-                if backend.import_sales_from_date:
-                    import_start_time = datetime.strptime(backend.import_updated_sales_from_date, '%Y-%m-%d %H:%M:%S')
-                else:
-                    import_start_time = import_end_time
-
-            sale_binding_model.import_batch(backend, filters={'ModTimeFrom':import_start_time.isoformat(),
-                                                              'ModTimeTo':import_end_time.isoformat()})
-            if update_import_date:
-                backend.write({'import_updated_sales_from_date':import_end_time})
+        """ The updated orders are imported with the new ones by
+        :meth:`_import_sale_orders` """
+        return self._import_sale_orders(import_start_time=import_start_time,
+                                        import_end_time=import_end_time,
+                                        update_import_date=update_import_date)
 
     def _get_token(self):
         
@@ -26,12 +26,11 @@ from odoo.addons.component.core import Component
 class MetadataBatchImporter(Component):
     """ Import the records directly, without delaying the jobs.
 
-    Import the eBay Orders, Products
+    Import the eBay Partners
     """
 
     _name = 'ebay.metadata.batch.importer'
     _inherit = 'ebay.direct.batch.importer'
     _apply_on = [
-        'ebay.product.product',
         'ebay.res.partner',
     ]
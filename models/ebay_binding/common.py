@@ -21,6 +21,7 @@
 ##############################################################################
 
 from odoo import api, models, fields
+from odoo.addons.queue_job.job import job
 
 
 class EbayBinding(models.AbstractModel):
@@ -43,24 +44,37 @@ class EbayBinding(models.AbstractModel):
     )
     # fields.Char because 0 is a valid eBay ID
     external_id = fields.Char(string='ID on eBay')
+    ebay_hash = fields.Char(
+        string='Hash of the eBay data',
+        help='Hash of the eBay data of the last import, the imports of '
+             'the same data are skipped.',
+        copy=False,
+    )
 
     _sql_constraints = [
         ('ebay_uniq', 'unique(backend_id, external_id)',
          'A binding already exists with the same eBay ID.'),
     ]
 
+    @job(default_channel='root.ebay')
     @api.model
-    def import_batch(self, backend, filters=None):
-        """ Prepare the import of records modified on eBay """
+    def import_batch(self, backend, filters=None, checkpoint=None):
+        """ Prepare the import of records modified on eBay
+
+        The errors are not caught: the transient errors of eBay retry
+        the job and the permanent ones make it fail.
+
+        :param checkpoint: ``ebay.import.progress`` of the search,
+                           advanced after each page
+        """
         if filters is None:
             filters = {}
 
-        try:
-            with backend.work_on(self._name) as work:
-                importer = work.component(usage='batch.importer')
-                return importer.run(filters=filters)
-        except Exception as e:
-            return e
+        with backend.work_on(self._name) as work:
+            importer = work.component(usage='batch.importer')
+            if checkpoint:
+                return importer.run(filters=filters, checkpoint=checkpoint)
+            return importer.run(filters=filters)
 
     @api.model
     def export_batch(self, backend, filters=None):
@@ -74,15 +88,22 @@ class EbayBinding(models.AbstractModel):
         except Exception as e:
             return e
 
+    @job(default_channel='root.ebay')
     @api.model
     def import_record(self, backend, external_id, force=False):
         """ Import a eBay record """
-        try:
-            with backend.work_on(self._name) as work:
-                importer = work.component(usage='record.importer')
-                return importer.run(external_id, force=False)
-        except Exception as e:
-            return e
+        with backend.work_on(self._name) as work:
+            importer = work.component(usage='record.importer')
+            return importer.run(external_id, force=force)
+
+    @job(default_channel='root.ebay')
+    @api.model
+    def import_chunk(self, backend, records):
+        """ Import a chunk of eBay records, see
+        ``ebay.delayed.chunk.batch.importer`` """
+        with backend.work_on(self._name) as work:
+            importer = work.component(usage='chunk.importer')
+            return importer.run(records)
 
     def export_record(self, fields=None):
         """ Export a record on eBay """
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import logging
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+# filters of GetOrders and watermark of the backend by stream, the
+# regular imports follow the modified orders, the backfills the created ones
+CHECKPOINT_STREAMS = {
+    'created':('CreateTimeFrom', 'CreateTimeTo', 'import_sales_from_date'),
+    'modified':('ModTimeFrom', 'ModTimeTo', 'import_sales_from_date'),
+}
+
+# states of the queue jobs still able to import a window
+LIVE_JOB_STATES = ('pending', 'enqueued', 'started')
+
+
+class EbayImportProgress(models.AbstractModel):
+    """ Progress of the import of a window of time of orders
+
+    Given as ``checkpoint`` to ``import_batch``, the batch importer
+    advances it after each page and commits it, so an interrupted import
+    can be resumed from the last committed page.
+    """
+    _name = 'ebay.import.progress'
+    _description = 'eBay import progress (abstract)'
+
+    stream = fields.Selection(
+        [('created', 'Created orders'),
+         ('modified', 'Modified orders')],
+        required=True,
+        default='created',
+    )
+    date_from = fields.Datetime('Window from')
+    date_to = fields.Datetime('Window to')
+    page_number = fields.Integer('Last page imported')
+    last_external_id = fields.Char('Last eBay record imported')
+    last_date = fields.Datetime('Date of the last eBay record imported')
+    record_count = fields.Integer('Records of the window')
+    page_record_count = fields.Integer('Records of the last page imported')
+    job_uuid = fields.Char('Job', readonly=True, copy=False)
+
+    def _has_live_job(self):
+        """ Return True while the job of the window may still import it """
+        self.ensure_one()
+        if not self.job_uuid:
+            return False
+        return bool(self.env['queue.job'].sudo().search_count([
+            ('uuid', '=', self.job_uuid),
+            ('state', 'in', LIVE_JOB_STATES),
+        ]))
+
+    def _reset_progress_values(self):
+        return {
+            'job_uuid':False,
+            'page_number':0,
+            'last_external_id':False,
+            'last_date':False,
+            'record_count':0,
+            'page_record_count':0,
+        }
+
+    def filters(self):
+        """ Return the filters of the search of the window, from the last
+        imported page: it is imported again, in case the records have
+        moved between the pages since """
+        self.ensure_one()
+        key_from, key_to, __ = CHECKPOINT_STREAMS[self.stream]
+        filters = {
+            key_from:fields.Datetime.from_string(self.date_from).isoformat(),
+            key_to:fields.Datetime.from_string(self.date_to).isoformat(),
+        }
+        if self.page_number > 1:
+            filters['Pagination'] = {'PageNumber':self.page_number}
+        return filters
+
+    def advance(self, page_number, last_external_id=None, last_date=None, record_count=0):
+        """ Record the import of a page and commit it
+
+        The last page imported is imported again when the window is
+        resumed, its records are only counted once.
+        """
+        self.ensure_one()
+        total = self.record_count + record_count
+        if page_number == self.page_number:
+            total -= self.page_record_count
+        self.write({
+            'state':'running',
+            'page_number':page_number,
+            'last_external_id':last_external_id or False,
+            'last_date':last_date or False,
+            'record_count':total,
+            'page_record_count':record_count,
+        })
+        self._commit()
+
+    def wait(self, job_uuid=None):
+        """ The end of the window has been delayed in a job
+
+        :param job_uuid: uuid of the job importing the end of the window
+        """
+        self.write({'state':'waiting', 'job_uuid':job_uuid or False})
+
+    def finish(self):
+        """ The window has been imported """
+        self.write({'state':'done'})
+        self._commit()
+
+    def _commit(self):
+        if not tools.config['test_enable']:
+            self.env.cr.commit()
+
+
+class EbayImportCheckpoint(models.Model):
+    """ Progress of the import of a stream of orders
+
+    The import of a window of time advances the checkpoint after each
+    page and commits it. When the import stops before the end of the
+    window, the next import resumes the window from the last committed
+    page. The watermark of the backend is moved to the end of the window
+    only once the whole window has been imported.
+    """
+    _name = 'ebay.import.checkpoint'
+    _inherit = 'ebay.import.progress'
+    _description = 'eBay import checkpoint'
+    _order = 'backend_id, stream'
+
+    backend_id = fields.Many2one(
+        comodel_name='ebay.backend',
+        string='eBay Backend',
+        required=True,
+        ondelete='cascade',
+    )
+    state = fields.Selection(
+        [('done', 'Done'),
+         ('running', 'Running'),
+         ('waiting', 'Waiting for a job')],
+        default='done',
+        required=True,
+        help="Waiting: the import of the window has been delayed in a job "
+             "after a transient error of eBay.",
+    )
+    order_density = fields.Float(
+        'Records by hour',
+        help='Density of the records observed by the last windows, used '
+             'to plan the size of the next ones.',
+    )
+
+    _sql_constraints = [
+        ('stream_uniq', 'unique(backend_id, stream)',
+         'A checkpoint already exists for this stream.'),
+    ]
+
+    @api.model
+    def for_stream(self, backend, stream):
+        checkpoint = self.search([('backend_id', '=', backend.id), ('stream', '=', stream)])
+        if not checkpoint:
+            checkpoint = self.create({'backend_id':backend.id, 'stream':stream})
+        return checkpoint
+
+    def start(self, date_from, date_to):
+        self.ensure_one()
+        values = self._reset_progress_values()
+        values.update({
+            'state':'running',
+            'date_from':date_from,
+            'date_to':date_to,
+        })
+        self.write(values)
+        self._commit()
+
+    def finish(self):
+        """ The window has been imported, move the watermark of the backend """
+        for checkpoint in self:
+            __, __, watermark = CHECKPOINT_STREAMS[checkpoint.stream]
+            checkpoint.backend_id.write({watermark:checkpoint.date_to})
+        super(EbayImportCheckpoint, self).finish()
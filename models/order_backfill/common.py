@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import logging
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.addons.queue_job.exception import RetryableJobError
+from odoo.addons.queue_job.job import job, identity_exact
+
+from ...components.window_planner import WindowPlanner
+
+_logger = logging.getLogger(__name__)
+
+
+class EbayOrderBackfill(models.Model):
+    """ Import of the history of the orders of a backend
+
+    The range of time is split in windows imported by parallel jobs on
+    the ``root.ebay`` channel. At most ``max_parallel`` windows are
+    delayed at the same time: each window finished delays the next ones.
+    The windows keep their progress as the checkpoints of the regular
+    imports, so a backfill interrupted is resumed from the last page
+    imported of each window.
+    """
+    _name = 'ebay.order.backfill'
+    _description = 'eBay order backfill'
+    _order = 'id desc'
+
+    backend_id = fields.Many2one(
+        comodel_name='ebay.backend',
+        string='eBay Backend',
+        required=True,
+        ondelete='cascade',
+    )
+    date_from = fields.Datetime('Orders from', required=True)
+    date_to = fields.Datetime('Orders to', required=True, default=fields.Datetime.now)
+    window_hours = fields.Integer(
+        'Hours by window',
+        help='Size of the windows of time imported by each job, 0 to size '
+             'them from the density of the orders of the backend.',
+    )
+    max_parallel = fields.Integer(
+        'Parallel jobs',
+        default=2,
+        help='Number of windows imported at the same time.',
+    )
+    min_remaining_calls = fields.Integer(
+        'Reserved calls',
+        default=500,
+        help='When the daily limit of GetOrders leaves less calls than this, '
+             'the next windows are delayed to the next day (UTC), so the '
+             'regular imports can still run.',
+    )
+    state = fields.Selection(
+        [('draft', 'Draft'),
+         ('running', 'Running'),
+         ('done', 'Done')],
+        default='draft',
+        required=True,
+        readonly=True,
+    )
+    window_ids = fields.One2many(
+        comodel_name='ebay.order.backfill.window',
+        inverse_name='backfill_id',
+        string='Windows',
+        readonly=True,
+    )
+    window_count = fields.Integer('Windows', compute='_compute_progress')
+    window_done_count = fields.Integer('Windows done', compute='_compute_progress')
+    window_failed_count = fields.Integer('Windows failed', compute='_compute_progress')
+    record_count = fields.Integer('Orders imported', compute='_compute_progress')
+
+    @api.depends('window_ids.state', 'window_ids.record_count')
+    def _compute_progress(self):
+        for backfill in self:
+            windows = backfill.window_ids
+            backfill.window_count = len(windows)
+            backfill.window_done_count = len(windows.filtered(lambda w: w.state == 'done'))
+            backfill.window_failed_count = len(windows.filtered(lambda w: w.state == 'failed'))
+            backfill.record_count = sum(windows.mapped('record_count'))
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for backfill in self:
+            if backfill.date_from >= backfill.date_to:
+                raise ValidationError(_('The start of the backfill must be before its end.'))
+
+    def _get_planner(self):
+        self.ensure_one()
+        if self.window_hours > 0:
+            return WindowPlanner(initial_span=timedelta(hours=self.window_hours))
+        # the density observed by the regular imports of the orders
+        checkpoint = self.env['ebay.import.checkpoint'].for_stream(self.backend_id, 'modified')
+        return WindowPlanner(density=checkpoint.order_density, target=self.backend_id.order_window_size)
+
+    def action_plan(self):
+        """ Split the range of time in windows """
+        for backfill in self:
+            if backfill.state != 'draft':
+                raise UserError(_('The windows of a started backfill cannot be planned again.'))
+            backfill.window_ids.unlink()
+            planner = backfill._get_planner()
+            start = fields.Datetime.from_string(backfill.date_from)
+            end = fields.Datetime.from_string(backfill.date_to)
+            for sequence, (date_from, date_to) in enumerate(planner.windows(start, end)):
+                self.env['ebay.order.backfill.window'].create({
+                    'backfill_id':backfill.id,
+                    'sequence':sequence,
+                    'date_from':date_from,
+                    'date_to':date_to,
+                })
+        return True
+
+    def action_start(self):
+        for backfill in self:
+            if backfill.state != 'draft':
+                continue
+            if not backfill.window_ids:
+                backfill.action_plan()
+            backend = backfill.backend_id
+            if not backend.import_sales_from_date:
+                # the regular import continues from the end of the backfill
+                backend.import_sales_from_date = backfill.date_to
+            backfill.state = 'running'
+            backfill._dispatch()
+        return True
+
+    def action_resume(self):
+        """ Delay again the windows failed or lost by their job (e.g. the
+        jobs of a worker killed), they restart from their last page """
+        for backfill in self:
+            if backfill.state != 'running':
+                continue
+            windows = backfill.window_ids.filtered(lambda w: w.state in ('failed', 'queued', 'running', 'waiting'))
+            lost = windows.filtered(lambda w: w.state == 'failed' or not w._has_live_job())
+            lost.write({'state':'pending', 'job_uuid':False})
+            backfill._dispatch()
+        return True
+
+    def _quota_eta(self):
+        """ Return the eta of the next windows: the next day (UTC) when
+        the daily limit of GetOrders is almost reached, None otherwise """
+        self.ensure_one()
+        quota = self.env['ebay.api.quota'].search([
+            ('backend_id', '=', self.backend_id.id),
+            ('method', '=', 'GetOrders'),
+        ], limit=1)
+        if not quota or not quota.daily_limit or quota.remaining_today >= self.min_remaining_calls:
+            return None
+        now = datetime.utcnow()
+        tomorrow = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        return tomorrow
+
+    def _dispatch(self):
+        """ Delay the import of the next windows, keeping at most
+        ``max_parallel`` windows delayed at the same time """
+        for backfill in self:
+            # serialize the dispatch of the windows finished at the same time
+            self.env.cr.execute('SELECT id FROM ebay_order_backfill WHERE id = %s FOR UPDATE', (backfill.id,))
+            backfill.invalidate_cache()
+            if backfill.state != 'running':
+                continue
+            windows = backfill.window_ids
+            if all(window.state == 'done' for window in windows):
+                backfill.state = 'done'
+                continue
+            busy = windows.filtered(lambda w: w.state in ('queued', 'running', 'waiting'))
+            free = max(backfill.max_parallel, 1) - len(busy)
+            if free <= 0:
+                continue
+            eta = backfill._quota_eta()
+            if eta:
+                _logger.info('Daily limit of GetOrders almost reached for backend %s, '
+                             'backfill %s delayed to %s', backfill.backend_id.name, backfill.id, eta)
+            for window in windows.filtered(lambda w: w.state == 'pending')[:free]:
+                window._delay(eta=eta)
+
+
+class EbayOrderBackfillWindow(models.Model):
+    """ Window of time of a backfill, imported by a job """
+    _name = 'ebay.order.backfill.window'
+    _inherit = 'ebay.import.progress'
+    _description = 'eBay order backfill window'
+    _order = 'backfill_id, sequence'
+
+    backfill_id = fields.Many2one(
+        comodel_name='ebay.order.backfill',
+        string='Backfill',
+        required=True,
+        ondelete='cascade',
+    )
+    backend_id = fields.Many2one(related='backfill_id.backend_id', store=True, readonly=True)
+    sequence = fields.Integer()
+    state = fields.Selection(
+        [('pending', 'Pending'),
+         ('queued', 'Queued'),
+         ('running', 'Running'),
+         ('waiting', 'Waiting for a job'),
+         ('done', 'Done'),
+         ('failed', 'Failed')],
+        default='pending',
+        required=True,
+    )
+    def _delay(self, eta=None):
+        self.ensure_one()
+        description = 'Backfill of the eBay orders from %s to %s' % (self.date_from, self.date_to)
+        delayed = self.with_delay(eta=eta, description=description, identity_key=identity_exact).import_window()
+        self.write({'state':'queued', 'job_uuid':getattr(delayed, 'uuid', False)})
+
+    @job(default_channel='root.ebay')
+    def import_window(self):
+        """ Import the orders of the window, from its last page imported """
+        self.ensure_one()
+        if self.state == 'done':
+            return _('Window already imported')
+        backend = self.backend_id
+        self.write({'state':'running'})
+        try:
+            return backend._get_sale_binding_model().import_batch(backend, filters=self.filters(), checkpoint=self)
+        except RetryableJobError:
+            # the job is retried from the last page committed
+            raise
+        except Exception:
+            self.env.cr.rollback()
+            self.write({'state':'failed'})
+            self.backfill_id._dispatch()
+            self._commit()
+            raise
+
+    def finish(self):
+        """ The window has been imported, delay the next windows """
+        self.write({'state':'done'})
+        self.mapped('backfill_id')._dispatch()
+        self._commit()
@@ -26,6 +26,7 @@ from collections import defaultdict
 
 from odoo import models, fields, api
 from odoo.addons.component.core import Component
+from odoo.addons.queue_job.job import job
 
 _logger = logging.getLogger(__name__)
 
@@ -45,10 +46,11 @@ class EbayResPartner(models.Model):
 
     alias = fields.Char()
 
+    @job(default_channel='root.ebay')
     @api.model
-    def import_record(self, backend, external_id):
+    def import_record(self, backend, external_id, force=False):
         _super = super(EbayResPartner, self)
-        return _super.import_record(backend, external_id)
+        return _super.import_record(backend, external_id, force=force)
 
 
 class EbayPartnerAdapter(Component):
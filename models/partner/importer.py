@@ -48,20 +48,22 @@ class PartnerImportMapper(Component):
         ('type', 'type'),
     ]
 
+    _record_fields = ['country', 'state']
+
     @mapping
     def country_id(self, record):
         if record.get('country'):
-            country = self.env['res.country'].search([('code', '=', record['country'])])
-            if country:
-                return {'country_id':country.id}
+            country_id = self.reference_cache.country_id(record['country'])
+            if country_id:
+                return {'country_id':country_id}
         return
 
     @mapping
     def state_id(self, record):
         if record.get('country') and record.get('state'):
-            state = self.env['res.country.state'].search([('country_id.code', '=', record['country']), ('name', '=', record['state'])])
-            if state:
-                return {'state_id':state.id}
+            state_id = self.reference_cache.state_id(record['country'], record['state'])
+            if state_id:
+                return {'state_id':state_id}
         return {'state_id':None}
 
     @only_create
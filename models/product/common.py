@@ -25,6 +25,7 @@ from collections import defaultdict
 
 from odoo import models, fields, api
 from odoo.addons.component.core import Component
+from odoo.addons.queue_job.job import job
 
 _logger = logging.getLogger(__name__)
 
@@ -65,10 +66,11 @@ class EbayProductProduct(models.Model):
 
     RECOMPUTE_QTY_STEP = 1000  # products at a time
 
+    @job(default_channel='root.ebay')
     @api.model
-    def import_record(self, backend, external_id):
+    def import_record(self, backend, external_id, force=False):
         _super = super(EbayProductProduct, self)
-        return _super.import_record(backend, external_id)
+        return _super.import_record(backend, external_id, force=force)
 
 
 class ProductMarketplaceData(models.Model):
@@ -113,8 +115,16 @@ class ProductProductAdapter(Component):
     _inherit = 'ebay.adapter'
     _apply_on = 'ebay.product.product'
 
-    def _call(self, method, arguments):
+    _page_size = 200  # maximum of GetSellerList
+    _record_list_path = ('ItemArray', 'Item')
+    _has_more_key = 'HasMoreItems'
+    _stream_records = True
+
+    def _call(self, method, arguments, **kwargs):
         try:
-            return super(ProductProductAdapter, self)._call(method, arguments)
+            return super(ProductProductAdapter, self)._call(method, arguments, **kwargs)
         except Exception:
             raise
+
+    def _parse_record(self, record):
+        return record.get('SKU') or record.get('ItemID'), record
@@ -37,9 +37,12 @@ _logger = logging.getLogger(__name__)
 class ProductProductBatchImporter(Component):
     """
     Import the eBay Products.
+
+    The items of the ``GetSellerList`` pages are imported by chunks,
+    one job for each chunk.
     """
     _name = 'ebay.product.product.batch.importer'
-    _inherit = 'ebay.direct.batch.importer'
+    _inherit = 'ebay.delayed.chunk.batch.importer'
     _apply_on = 'ebay.product.product'
 
 
@@ -54,8 +57,6 @@ class ProductImportMapper(Component):
               ('Quantity', 'ebay_qty'),
               ]
 
-    children = [('product_product_market_ids', 'product_product_market_ids', 'ebay.product.product.detail'), ]
-
     @mapping
     def backend_id(self, record):
         return {'backend_id':self.backend_record.id}
@@ -150,14 +151,15 @@ class ProductImporter(Component):
         binding = super(ProductImporter, self)._create(data)
         return binding
 
-    def run(self, external_id, force=False):
+    def run(self, external_id, force=False, **kwargs):
         """ Run the synchronization
 
         :param external_id: identifier of the record on eBay
         """
         self.external_id = external_id
+        self.ebay_record = external_id[1]
         _super = super(ProductImporter, self)
-        _super.run(external_id=external_id[0], force=force)
+        return _super.run(external_id=external_id[0], force=force, **kwargs)
 
 
 class ProductProductMarketImportMapper(Component):
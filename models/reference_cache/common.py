@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from collections import defaultdict
+
+from odoo import models, api, tools
+
+
+class EbayReferenceCache(models.AbstractModel):
+    """ Lookups of the reference data used by the import mappers
+
+    The sales teams, currencies, countries and states are looked up for
+    each order and partner imported. The ids found are kept in the
+    ``ormcache`` of the registry, keyed by a generation of the model
+    looked up. The generation is increased when one of its records is
+    created, written or deleted, so only the lookups of this model are
+    computed again, the other caches of the registry of the worker are
+    kept. The mappers use it through ``EbayImportMapper.reference_cache``.
+    """
+    _name = 'ebay.reference.cache'
+    _description = 'eBay reference data lookups'
+
+    # generation of the reference data of each model, in this worker
+    _generations = defaultdict(int)
+
+    @api.model
+    def _generation(self, model_name):
+        return self._generations[model_name]
+
+    @api.model
+    def invalidate(self, model_name):
+        """ Forget the lookups of the records of ``model_name`` """
+        self._generations[model_name] += 1
+        # the other workers only have the signaling of the registry,
+        # they clear their cache once at the end of the transaction
+        self.pool.cache_invalidated = True
+
+    @api.model
+    @tools.ormcache('self._generation("crm.team")', 'name', 'self.env.lang')
+    def team_id(self, name):
+        """ Return the id of the sales team ``name``, False if none, the
+        name of the teams is translated in the language of the context """
+        return self.env['crm.team'].sudo().search([('name', '=', name)], limit=1).id
+
+    @api.model
+    @tools.ormcache('self._generation("res.currency")', 'code')
+    def currency_id(self, code):
+        """ Return the id of the currency of ISO code ``code`` """
+        return self.env['res.currency'].sudo().search([('name', '=', code)], limit=1).id
+
+    @api.model
+    @tools.ormcache('self._generation("res.country")', 'code')
+    def country_id(self, code):
+        """ Return the id of the country of ISO code ``code`` """
+        return self.env['res.country'].sudo().search([('code', '=', code)], limit=1).id
+
+    @api.model
+    @tools.ormcache('self._generation("res.country.state")', 'country_code', 'name')
+    def state_id(self, country_code, name):
+        """ Return the id of the state ``name`` of a country """
+        return self.env['res.country.state'].sudo().search([('country_id.code', '=', country_code),
+                                                            ('name', '=', name)], limit=1).id
+
+
+class EbayReferenceCacheInvalidation(models.AbstractModel):
+    """ Invalidate the lookups of ``ebay.reference.cache`` of the model
+    when its reference data changes
+
+    ``_reference_cache_fields`` are the fields used by the lookups: the
+    other writes (e.g. the members of a sales team) keep the cache.
+    """
+    _name = 'ebay.reference.cache.invalidation'
+    _description = 'eBay reference data lookups invalidation'
+
+    _reference_cache_fields = ()
+
+    def _clear_reference_cache(self):
+        self.env['ebay.reference.cache'].invalidate(self._name)
+
+    @api.model
+    def create(self, vals):
+        record = super(EbayReferenceCacheInvalidation, self).create(vals)
+        self._clear_reference_cache()
+        return record
+
+    @api.multi
+    def write(self, vals):
+        result = super(EbayReferenceCacheInvalidation, self).write(vals)
+        if any(field in vals for field in self._reference_cache_fields):
+            self._clear_reference_cache()
+        return result
+
+    @api.multi
+    def unlink(self):
+        result = super(EbayReferenceCacheInvalidation, self).unlink()
+        self._clear_reference_cache()
+        return result
+
+
+class CrmTeam(models.Model):
+    _name = 'crm.team'
+    _inherit = ['crm.team', 'ebay.reference.cache.invalidation']
+    _reference_cache_fields = ('name', 'active', 'company_id')
+
+
+class ResCurrency(models.Model):
+    _name = 'res.currency'
+    _inherit = ['res.currency', 'ebay.reference.cache.invalidation']
+    _reference_cache_fields = ('name', 'active')
+
+
+class ResCountry(models.Model):
+    _name = 'res.country'
+    _inherit = ['res.country', 'ebay.reference.cache.invalidation']
+    _reference_cache_fields = ('code',)
+
+
+class ResCountryState(models.Model):
+    _name = 'res.country.state'
+    _inherit = ['res.country.state', 'ebay.reference.cache.invalidation']
+    _reference_cache_fields = ('name', 'country_id')
@@ -21,10 +21,15 @@
 ##############################################################################
 
 import logging
+from decimal import Decimal
 
 import odoo.addons.decimal_precision as dp
 from odoo import models, fields, api, _
 from odoo.addons.component.core import Component
+from odoo.addons.queue_job.job import job
+from odoo.addons.connector.exception import IDMissingInBackend
+
+from ...components.backend_adapter import as_list, ebay_value, to_odoo_datetime
 
 _logger = logging.getLogger(__name__)
 
@@ -48,7 +53,6 @@ class EbaySaleOrder(models.Model):
         inverse_name='ebay_order_id',
         string='eBay Order Lines'
     )
-    partner_id = fields.Many2one('ebay.res.partner', "Id of partner", required=False)
     id_ebay_order = fields.Char(string='eBay Order Id', help='An eBay-defined order identifier', required=True)
     date_purchase = fields.Datetime('The date of purchase', required=False)
     order_status_id = fields.Many2one('ebay.config.order.status', "order_status_id", required=False)
@@ -150,18 +154,11 @@ class EbaySaleOrder(models.Model):
     )
     buyer_tax_identifier_id = fields.Char(string='Buyer Tax Identifier ID')
     
+    @job(default_channel='root.ebay')
     @api.model
-    def import_record(self, backend, external_id):
+    def import_record(self, backend, external_id, force=False):
         _super = super(EbaySaleOrder, self)
-        return _super.import_record(backend, external_id)
-
-    @api.model
-    def create(self, vals):
-        ebay_order_id = vals['id_ebay_order']
-        binding = self.env['ebay.sale.order'].browse(ebay_order_id)
-        vals['ebay_order_id'] = binding.odoo_id.id
-        binding = super(EbaySaleOrderLine, self).create(vals)
-        return binding
+        return _super.import_record(backend, external_id, force=force)
 
 
 class SaleOrder(models.Model):
@@ -242,7 +239,6 @@ class EbaySaleOrderLine(models.Model):
         required=False,
     )
 
-    product_id = fields.Many2one('ebay.product.product')
     qty_shipped = fields.Integer()
     qty_ordered = fields.Integer()
     item_price = fields.Float()
@@ -319,8 +315,165 @@ class SaleOrderAdapter(Component):
     _inherit = 'ebay.adapter'
     _apply_on = 'ebay.sale.order'
 
-    def _call(self, method, arguments):
+    _page_size = 100  # maximum of GetOrders
+    _record_list_path = ('OrderArray', 'Order')
+    _has_more_key = 'HasMoreOrders'
+    _stream_records = True
+    # fields of an Order read by _parse_order for each key of the orders
+    _output_selectors = {
+        'order_id':['OrderID'],
+        'order_status':['OrderStatus'],
+        'checkout_status':['CheckoutStatus.Status'],
+        'date_order':['CreatedTime'],
+        'date_modified':['CheckoutStatus.LastModifiedTime'],
+        'currency':['Total'],
+        'total_ship_amount':['ShippingServiceSelected.ShippingServiceCost'],
+        'earlest_delivery_date':['ShippingServiceSelected.ShippingPackageInfo.EstimatedDeliveryTimeMin'],
+        'lastest_delivery_date':['ShippingServiceSelected.ShippingPackageInfo.EstimatedDeliveryTimeMax'],
+        'lastest_ship_date':['ShippingServiceSelected.ShippingPackageInfo.HandleByTime'],
+        'partner.email':['TransactionArray.Transaction.Buyer.Email', 'BuyerUserID'],
+        'partner.alias':['BuyerUserID'],
+        'partner.name':['ShippingAddress.Name'],
+        'partner.phone':['ShippingAddress.Phone'],
+        'partner.street':['ShippingAddress.Street1'],
+        'partner.street2':['ShippingAddress.Street2'],
+        'partner.city':['ShippingAddress.CityName'],
+        'partner.zip':['ShippingAddress.PostalCode'],
+        'partner.country':['ShippingAddress.Country'],
+        'partner.state':['ShippingAddress.StateOrProvince'],
+        'lines.item_id':['TransactionArray.Transaction.OrderLineItemID', 'TransactionArray.Transaction.Item.ItemID'],
+        'lines.id_item':['TransactionArray.Transaction.Item.ItemID'],
+        'lines.sku':['TransactionArray.Transaction.Variation.SKU', 'TransactionArray.Transaction.Item.SKU'],
+        'lines.name':['TransactionArray.Transaction.Variation.VariationTitle', 'TransactionArray.Transaction.Item.Title'],
+        'lines.qty_ordered':['TransactionArray.Transaction.QuantityPurchased'],
+        'lines.price_unit':['TransactionArray.Transaction.TransactionPrice'],
+        'lines.item_price':['TransactionArray.Transaction.TransactionPrice', 'TransactionArray.Transaction.QuantityPurchased'],
+        'lines.ship_price':['TransactionArray.Transaction.ActualShippingCost'],
+        'totals':['TransactionArray.Transaction.TransactionPrice', 'TransactionArray.Transaction.QuantityPurchased',
+                  'TransactionArray.Transaction.ActualShippingCost'],
+    }
+
+    def _extra_output_fields(self):
+        # read by SaleOrderBatchImporter._checkpoint_values
+        return ['date_modified']
+
+    def _pagination_output_fields(self):
+        return super(SaleOrderAdapter, self)._pagination_output_fields() + ['OrdersPerPage', 'ReturnedOrderCountActual']
+
+    def _call(self, method, arguments, **kwargs):
         try:
-            return super(SaleOrderAdapter, self)._call(method, arguments)
+            return super(SaleOrderAdapter, self)._call(method, arguments, **kwargs)
         except:
             raise
+
+    def _get_prefetch_pages(self):
+        return max(self.backend_record.order_prefetch_pages, 0)
+
+    def _parse_partner(self, order, transactions):
+        address = order.get('ShippingAddress') or {}
+        buyer = (transactions[0].get('Buyer') if transactions else None) or {}
+        email = buyer.get('Email')
+        if not email or '@' not in email:
+            # eBay hides the email of some buyers ('Invalid Request')
+            email = order.get('BuyerUserID')
+        return {
+            'email':email,
+            'alias':order.get('BuyerUserID'),
+            'name':address.get('Name'),
+            'phone':address.get('Phone'),
+            'street':address.get('Street1'),
+            'street2':address.get('Street2'),
+            'street3':None,
+            'city':address.get('CityName'),
+            'zip':address.get('PostalCode'),
+            'country':address.get('Country'),
+            'state':address.get('StateOrProvince'),
+        }
+
+    def _parse_line(self, transaction):
+        item = transaction.get('Item') or {}
+        variation = transaction.get('Variation') or {}
+        qty_ordered = int(transaction.get('QuantityPurchased') or 0)
+        price_unit = Decimal(str(ebay_value(transaction.get('TransactionPrice')) or 0))
+        ship_price = Decimal(str(ebay_value(transaction.get('ActualShippingCost')) or 0))
+        return {
+            'item_id':transaction.get('OrderLineItemID') or item.get('ItemID'),
+            'id_item':item.get('ItemID'),
+            'sku':variation.get('SKU') or item.get('SKU'),
+            'name':variation.get('VariationTitle') or item.get('Title'),
+            'qty_ordered':qty_ordered,
+            'price_unit':float(price_unit),
+            'item_price':float(price_unit * qty_ordered),
+            'ship_price':float(ship_price),
+        }
+
+    def _order_totals(self, lines):
+        """ Sum the amounts and the quantities of the lines of an order
+        in one pass
+
+        The sums are done on decimals: the amounts of the lines are
+        converted from their shortest representation, which is the
+        value read from eBay, so the totals don't depend on the float
+        rounding of the lines.
+        """
+        product_amount = ship_amount = Decimal(0)
+        qty_ordered = 0
+        for line in lines:
+            product_amount += Decimal(str(line['item_price']))
+            ship_amount += Decimal(str(line['ship_price']))
+            qty_ordered += line['qty_ordered']
+        return {
+            'line_count':len(lines),
+            'qty_ordered':qty_ordered,
+            'product_amount':float(product_amount),
+            'ship_amount':float(ship_amount),
+            'amount':float(product_amount + ship_amount),
+        }
+
+    def _parse_order(self, order):
+        """ Convert a GetOrders ``Order`` to the data used by the mappers """
+        transactions = as_list((order.get('TransactionArray') or {}).get('Transaction'))
+        shipping = order.get('ShippingServiceSelected') or {}
+        package = shipping.get('ShippingPackageInfo') or {}
+        if isinstance(package, list):
+            package = package[0]
+        total = order.get('Total') or {}
+        lines = [self._parse_line(transaction) for transaction in transactions]
+        return {
+            'order_id':order.get('OrderID'),
+            'order_status':order.get('OrderStatus'),
+            'checkout_status':(order.get('CheckoutStatus') or {}).get('Status'),
+            'date_order':to_odoo_datetime(order.get('CreatedTime')),
+            'date_modified':to_odoo_datetime((order.get('CheckoutStatus') or {}).get('LastModifiedTime')),
+            'currency':total.get('_currencyID') if isinstance(total, dict) else None,
+            'total_ship_amount':ebay_value(shipping.get('ShippingServiceCost')),
+            'earlest_delivery_date':to_odoo_datetime(package.get('EstimatedDeliveryTimeMin')),
+            'lastest_delivery_date':to_odoo_datetime(package.get('EstimatedDeliveryTimeMax')),
+            'lastest_ship_date':to_odoo_datetime(package.get('HandleByTime')),
+            'partner':self._parse_partner(order, transactions),
+            'lines':lines,
+            'totals':self._order_totals(lines),
+        }
+
+    def _parse_record(self, record):
+        order = self._parse_order(record)
+        return order['order_id'], order
+
+    def read(self, external_id, attributes=None):
+        """ Returns the information of an order
+
+        :rtype: dict
+        """
+        arguments = {'OrderIDArray':{'OrderID':external_id}}
+        output_selector = self._output_selector()
+        if output_selector:
+            arguments['OutputSelector'] = output_selector
+
+        def fetch():
+            response = self._call('ebay_sale_order_read', arguments)
+            orders = self._page_records(response.dict())
+            if not orders:
+                raise IDMissingInBackend
+            return self._parse_order(orders[0])
+
+        return self._cached_call('ebay_sale_order_read', arguments, fetch, external_id=external_id)
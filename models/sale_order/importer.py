@@ -24,11 +24,11 @@ import logging
 from datetime import datetime, timedelta
 from re import search as re_search
 
-from odoo import _
 from odoo.addons.component.core import Component
 from odoo.addons.connector.components.mapper import mapping
 from odoo.addons.queue_job.exception import NothingToDoJob, FailedJobError
 
+from ...components.importer import payload_hash
 from ...components.mapper import normalize_datetime
 from ...exception import OrderImportRuleRetry
 
@@ -42,6 +42,50 @@ class SaleOrderBatchImporter(Component):
 
     # TODO change direct batch importer for delayed batch importer
 
+    def _checkpoint_values(self, record):
+        if not record:
+            return None, None
+        order_id, order = record
+        return order_id, order.get('date_modified') or order.get('date_order')
+
+    def _use_pipeline(self):
+        return self.backend_record.order_import_pipeline
+
+    def _get_create_chunk_size(self):
+        return max(self.backend_record.order_create_chunk_size, 0)
+
+    def _orders_to_import(self, records):
+        """ Return the orders of a page which are new or changed on eBay,
+        the importer skips the others as up-to-date
+
+        Their hash is left in the cache of the session for the importer.
+        """
+        cache = getattr(self.work, 'ebay_cache', None)
+        orders = []
+        for order_id, order in records:
+            binding = self.binder.to_internal(order_id)
+            if binding and binding.ebay_hash:
+                key = (self.model._name, str(order_id))
+                order_hash = cache.payload_hashes.get(key) if cache is not None else None
+                if not order_hash:
+                    order_hash = payload_hash(order)
+                    if cache is not None:
+                        cache.payload_hashes[key] = order_hash
+                if binding.ebay_hash == order_hash:
+                    continue
+            orders.append(order)
+        return orders
+
+    def _prefetch_bindings(self, records):
+        super(SaleOrderBatchImporter, self)._prefetch_bindings(records)
+        orders = self._orders_to_import(records)
+        self.binder_for('ebay.res.partner').prefetch(
+            order['partner']['email'] for order in orders)
+        # the missing products are imported with their order, in its
+        # savepoint, and find the others in the cache of the session
+        self.binder_for('ebay.product.product').prefetch(
+            line['sku'] for order in orders for line in order['lines'])
+
     '''
     def _import_record(self, external_id, job_options=None, **kwargs):
         job_options = {
@@ -62,21 +106,24 @@ class SaleOrderImportMapper(Component):
     direct = [('order_id', 'external_id'),
               ('order_id', 'id_ebay_order'),
               ('date_order', 'date_purchase'),
-              ('total_product_price', 'total_product_amount'),
-              ('', 'total_ship_amount'),
               ('earlest_delivery_date', 'date_earliest_delivery'),
               ('earlest_ship_date', 'date_earliest_ship'),
               ('lastest_delivery_date', 'date_latest_delivery'),
               ('lastest_ship_date', 'date_latest_ship'),
               ('FulfillmentChannel', 'fullfillment_channel'),
-              ('ship_service_level', 'shipment_service_level_category'),
               ]
 
     children = [('lines', 'ebay_order_line_ids', 'ebay.sale.order.line'), ]
 
+    _record_fields = ['currency',
+                      'totals',
+                      'lines.id_item',
+                      ('partner', 'ebay.res.partner'),
+                      ]
+
     def _add_shipping_line(self, map_record, values):
         record = map_record.source
-        amount_incl = float(record.get('total_ship_amount') or 0.0)
+        amount_incl = (record.get('totals') or {}).get('ship_amount') or 0.0
         line_builder = self.component(usage='order.line.builder.shipping')
         # add even if the price is 0, otherwise odoo will add a shipping
         # line in the order when we ship the picking
@@ -93,11 +140,7 @@ class SaleOrderImportMapper(Component):
     def finalize(self, map_record, values):
         values.setdefault('order_line', [])
         # values = self._add_shipping_line(map_record, values)
-        values.update({
-            'partner_id':self.partner_id,
-            'partner_invoice_id':self.partner_id,
-            'partner_shipping_id':self.partner_id,
-        })
+        return values
 
     @mapping
     def name(self, record):
@@ -114,13 +157,15 @@ class SaleOrderImportMapper(Component):
         assert partner, (
                 "customer_id %s should have been imported in "
                 "SaleOrderImporter._import_dependency" % record['partner']['email'])
-        return {'partner_id':partner.id}
+        return {'partner_id':partner.id,
+                'partner_invoice_id':partner.id,
+                'partner_shipping_id':partner.id}
 
     @mapping
     def sales_team(self, record):
-        team = self.env['crm.team'].search([('name', '=', 'eBay Sales')])
-        if team:
-            return {'team_id':team.id}
+        team_id = self.reference_cache.team_id('eBay Sales')
+        if team_id:
+            return {'team_id':team_id}
 
     @mapping
     def warehouse_id(self, record):
@@ -133,48 +178,18 @@ class SaleOrderImportMapper(Component):
     @mapping
     def currency_id(self, record):
         if record['currency']:
-            currency = self.env['res.currency'].search([('name', '=', record['currency'])])
-            if currency:
-                return {'currency_id':currency.id}
+            currency_id = self.reference_cache.currency_id(record['currency'])
+            if currency_id:
+                return {'currency_id':currency_id}
 
     @mapping
-    def total_product_amount(self, record):
-        if record.get('lines'):
-            total_product_amount = 0.
-            for line in record['lines']:
-                total_product_amount += float(line['item_price'] or 0.)
-
-            record['total_pruduct_amount'] = total_product_amount
-            return {'total_pruduct_amount':total_product_amount}
-
-        return
-
-    @mapping
-    def total_ship_amount(self, record):
-        if record.get('lines'):
-            total_ship_amount = 0.
-            for line in record['lines']:
-                total_ship_amount += float(line['ship_price'] or 0.)
-
-            record['total_ship_amount'] = total_ship_amount
-            return {'total_ship_amount':total_ship_amount}
-
-        return
-
-    @mapping
-    def total_amount(self, record):
-        if record.get('lines'):
-            total_amount = 0.
-            for line in record['lines']:
-                total_amount += float(line['item_price'] or 0.) + float(line['ship_price'] or 0.)
-
-            record['total_amount'] = total_amount
-            return {'total_amount':total_amount}
-
-        return
-
-    # partner_id, partner_invoice_id, partner_shipping_id
-    # are done in the importer
+    def totals(self, record):
+        # summed by SaleOrderAdapter._order_totals
+        totals = record.get('totals')
+        if totals:
+            return {'total_product_amount':totals['product_amount'],
+                    'total_ship_amount':totals['ship_amount'],
+                    'total_amount':totals['amount']}
 
     @mapping
     def backend_id(self, record):
@@ -186,30 +201,46 @@ class SaleOrderImporter(Component):
     _inherit = 'ebay.importer'
     _apply_on = ['ebay.sale.order']
 
-    def _must_skip(self):
-        """ Hook called right after we read the data from the backend.
-
-        If the method returns a message giving a reason for the
-        skipping, the import will be interrupted and the message
-        recorded in the job (if the import is called directly by the
-        job, not by dependencies).
+    def _import_dependencies(self):
+        partner = self.ebay_record['partner']
+        self._import_dependency(external_id=partner['email'], binding_model='ebay.res.partner', ebay_record=partner)
+        self._import_products(self.ebay_record['lines'])
+
+    def _product_record(self, line):
+        """ Return the record of the product of a line for the import of a
+        missing product: the keys of a ``GetSellerList`` item mapped by
+        ``ebay.product.product.import.mapper`` which are known by the line
+        (``SKU``, ``ItemID`` and ``Title``) """
+        return {
+            'SKU':line['sku'],
+            'ItemID':line.get('id_item'),
+            'Title':line.get('name'),
+        }
 
-        If it returns None, the import will continue normally.
+    def _import_products(self, lines):
+        """ Bind the products of the lines
 
-        :returns: None | str | unicode
+        The SKUs are resolved in one query, the missing products are
+        imported together by the chunk importer of the products, from
+        the data of the lines, each in its own savepoint. The line
+        mapper then finds the products in the cache of the session.
         """
-        if self.binder.to_internal(self.external_id):
-            return _('Already imported')
-
-    def _import_dependencies(self):
-        importer = self.component(usage='record.importer', model_name='ebay.res.partner')
-        importer.ebay_record = self.ebay_record['partner']
-        self._import_dependency(external_id=self.ebay_record['partner']['email'], binding_model='ebay.res.partner', importer=importer)
-        self.ebay_record['partner_id'] = self.env['ebay.res.partner'].search([('email', '=', self.ebay_record['partner']['email'])]).id
+        binder = self.binder_for('ebay.product.product')
+        skus = {line['sku'] for line in lines if line.get('sku')}
+        binder.prefetch(skus)
+        missing = {}
+        for line in lines:
+            sku = line.get('sku')
+            if sku in skus and sku not in missing and not binder.to_internal(sku):
+                missing[sku] = (sku, self._product_record(line))
+        if not missing:
+            return
+        importer = self.component(usage='chunk.importer', model_name='ebay.product.product')
+        records = list(missing.values())
+        importer._prefetch_bindings(records)
+        importer._import_page(records)
 
     def _create(self, data):
-        import wdb
-        wdb.set_trace()
         binding = super(SaleOrderImporter, self)._create(data)
         if binding.fiscal_position_id:
             binding.odoo_id._compute_tax_id()
@@ -224,24 +255,25 @@ class SaleOrderImporter(Component):
         return super(SaleOrderImporter, self)._create_data(
             map_record,
             tax_include=True,
-            partner_id=self.ebay_record['partner_id'],
-            partner_invoice_id=self.ebay_record['partner_id'],
-            partner_shipping_id=self.ebay_record['partner_id'],
             **kwargs)
 
     def _update_data(self, map_record, **kwargs):
         return super(SaleOrderImporter, self)._update_data(
             map_record,
             tax_include=True,
+            binding=self._get_binding(),
             **kwargs)
 
     def _after_import(self, binding):
         """ Hook called at the end of the import """
         return
 
-    def run(self, external_id, force=False):
+    def run(self, external_id, force=False, **kwargs):
         """ Run the synchronization
 
+        An order already imported is updated, the modified orders come
+        with the new ones in the same search.
+
         :param external_id: identifier of the record on eBay
         """
         if external_id and (isinstance(external_id, list) or isinstance(external_id, tuple)):
@@ -250,7 +282,33 @@ class SaleOrderImporter(Component):
         else:
             self.external_id = external_id
         _super = super(SaleOrderImporter, self)
-        _super.run(self.external_id, force)
+        return _super.run(self.external_id, force, **kwargs)
+
+
+class SaleOrderLineImportMapChild(Component):
+    """ Map the lines of an order
+
+    When the order is already imported, its lines are updated by their
+    eBay id instead of being added again.
+    """
+    _name = 'ebay.sale.order.line.map.child.import'
+    _inherit = ['base.map.child.import', 'base.ebay.connector']
+    _apply_on = 'ebay.sale.order.line'
+
+    def get_items(self, items, parent, to_attr, options):
+        commands = super(SaleOrderLineImportMapChild, self).get_items(items, parent, to_attr, options)
+        binding = options.get('binding')
+        if not binding:
+            return commands
+        lines = {line.external_id:line for line in binding.ebay_order_line_ids}
+        result = []
+        for command in commands:
+            line = lines.get(command[2].get('external_id'))
+            if line:
+                result.append((1, line.id, command[2]))
+            else:
+                result.append(command)
+        return result
 
 
 class SaleOrderLineImportMapper(Component):
@@ -264,36 +322,17 @@ class SaleOrderLineImportMapper(Component):
               ('item_id', 'external_id'),
               ]
 
+    _record_fields = ['sku', 'price_unit']
+
     @mapping
     def product_id(self, record):
         binder = self.binder_for('ebay.product.product')
         product = binder.to_internal(record['sku'], unwrap=True)
         assert product, (
-                "product_id %s should have been imported in "
-                "SaleOrderImporter._import_dependencies" % record['product_id'])
+                "product %s should have been imported in "
+                "SaleOrderImporter._import_products" % record['sku'])
         return {'product_id':product.id}
 
     @mapping
     def price(self, record):
         return {'price_unit':record['price_unit']}
-
-    def _import_dependencies(self):
-        record = self.ebay_record
-
-        # Check if the product is imported
-        product = self.env['ebay.product.product'].search([('sku', '=', record.get('sku'))])
-        if not product:
-            self._import_dependency(record['sku'], 'ebay.product.product')
-
-    def run(self, external_id, force=False):
-        """ Run the synchronization
-
-        :param external_id: identifier of the record on eBay
-        """
-        if external_id and (isinstance(external_id, list) or isinstance(external_id, tuple)):
-            self.external_id = external_id[0]
-            self.ebay_record = external_id[1]
-        else:
-            self.external_id = external_id
-        _super = super(SaleOrderImporter, self)
-        _super.run(external_id[0], force)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Compare the compiled import mappers (``compile_mapper`` in
+``components/mapper.py``) with the generic mappers of the connector on
+the synthetic orders of ``scripts/fake_trading_server.py``.
+
+The orders are mapped by the sale order mapper, with its children, when
+the partners are bound by ``ebay.res.partner``, by the line mapper only
+otherwise. The bindings needed by the mappers are created in a
+transaction rolled back at the end. The values of both mappers are
+compared for each record.
+
+Usage, in the shell of a database where connector_ebay is installed::
+
+    EBAY_BENCH_ORDERS=2000 EBAY_BENCH_LINES=3 \
+        odoo shell -d mydb < scripts/benchmark_mappers.py
+
+"""
+
+import os
+import sys
+import time
+
+# run from the root of the module, the shell reads the script on stdin
+sys.path.insert(0, 'scripts')
+
+from fake_trading_server import get_orders_response
+
+
+def _parse_orders(adapter, content):
+    from odoo.addons.connector_ebay.components.trading_decoder import TradingResponsePage
+    page = TradingResponsePage(content, adapter._record_list_path, [adapter._has_more_key])
+    return [order for __, order in adapter.parse_page(page)]
+
+
+def _mapper_classes(mapper, model_names):
+    return [type(mapper.component(usage='import.mapper', model_name=model_name))
+            for model_name in model_names]
+
+
+def _use_compiled(classes, compiled):
+    """ The mappers compile again when ``_ebay_compiled_mapper`` is
+    removed, they use the generic mapper when it is None """
+    for cls in classes:
+        if not compiled:
+            cls._ebay_compiled_mapper = None
+        elif '_ebay_compiled_mapper' in cls.__dict__:
+            del cls._ebay_compiled_mapper
+
+
+def _map_all(mapper, records):
+    start = time.time()
+    values = [mapper.map_record(record).values(for_create=True) for record in records]
+    return values, time.time() - start
+
+
+def _bind(env, backend, orders, with_partners):
+    skus = {line['sku'] for order in orders for line in order['lines']}
+    for sku in skus:
+        env['ebay.product.product'].create({'backend_id':backend.id, 'external_id':sku,
+                                            'sku':sku, 'name':sku})
+    if with_partners:
+        emails = {order['partner']['email'] for order in orders}
+        for email in emails:
+            env['ebay.res.partner'].create({'backend_id':backend.id, 'external_id':email,
+                                            'email':email, 'name':email})
+
+
+def main(env, orders=2000, lines=2, rounds=3):
+    backend = env['ebay.backend'].search([], limit=1)
+    assert backend, 'an eBay backend is needed'
+    with_partners = 'ebay.res.partner' in env
+    content = get_orders_response(orders, lines)
+    with backend.work_on('ebay.sale.order') as work:
+        adapter = work.component(usage='backend.adapter')
+        parsed = _parse_orders(adapter, content)
+        if with_partners:
+            model_names = ['ebay.sale.order', 'ebay.sale.order.line']
+            records = parsed
+        else:
+            model_names = ['ebay.sale.order.line']
+            records = [line for order in parsed for line in order['lines']]
+        mapper = work.component(usage='import.mapper', model_name=model_names[0])
+        classes = _mapper_classes(mapper, model_names)
+        env.cr.execute('SAVEPOINT benchmark_mappers')
+        try:
+            _bind(env, backend, parsed, with_partners)
+            print('%s: %d records, %d rounds' % (model_names[0], len(records), rounds))
+            results = {}
+            for name, compiled in (('generic', False), ('compiled', True)):
+                _use_compiled(classes, compiled)
+                timings = []
+                for __ in range(rounds):
+                    values, elapsed = _map_all(mapper, records)
+                    timings.append(elapsed)
+                results[name] = values
+                best = min(timings)
+                print('%-8s %8.0f records/s  best %.3fs' % (name, len(records) / best if best else 0., best))
+            different = sum(1 for generic, compiled in zip(results['generic'], results['compiled'])
+                            if generic != compiled)
+            print('records mapped differently: %d' % different)
+        finally:
+            _use_compiled(classes, True)
+            env.cr.execute('ROLLBACK TO SAVEPOINT benchmark_mappers')
+
+
+if 'env' in globals():
+    main(env,
+         orders=int(os.environ.get('EBAY_BENCH_ORDERS', 2000)),
+         lines=int(os.environ.get('EBAY_BENCH_LINES', 2)))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Compare the decoders of the Trading API responses on a synthetic
+``GetOrders`` page: the dicts of ``ebaysdk`` (``response.dict()``) and
+the streaming decoder of ``components/trading_decoder.py``.
+
+Each decoder runs in its own process, the peak RSS is measured above
+the RSS of the process once the payload is loaded. The records of both
+decoders are then compared.
+
+Usage::
+
+    python scripts/benchmark_trading_decoder.py --orders 5000 --lines 3
+
+Requires lxml and ebaysdk, but not Odoo. The payload is built like the
+responses of ``scripts/fake_trading_server.py``.
+
+"""
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import resource
+import time
+
+from fake_trading_server import get_orders_response
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DECODER_PATH = os.path.join(HERE, os.pardir, 'components', 'trading_decoder.py')
+
+def _load_decoder():
+    spec = importlib.util.spec_from_file_location('trading_decoder', DECODER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _RawResponse(object):
+    def __init__(self, content):
+        self.content = content
+
+
+def decode_dict(content):
+    from ebaysdk.response import Response
+    response = Response(_RawResponse(content), verb='GetOrders')
+    orders = response.dict()['OrderArray']['Order']
+    count = 0
+    for order in orders:
+        count += 1
+    return count
+
+
+def decode_stream(content):
+    decoder = _load_decoder()
+    page = decoder.TradingResponsePage(content, ('OrderArray', 'Order'), ['HasMoreOrders'])
+    page.get('HasMoreOrders')
+    count = 0
+    for order in page.records():
+        count += 1
+    return count
+
+
+def dict_records(content):
+    from ebaysdk.response import Response
+    response = Response(_RawResponse(content), verb='GetOrders')
+    return response.dict()['OrderArray']['Order']
+
+
+def stream_records(content):
+    decoder = _load_decoder()
+    page = decoder.TradingResponsePage(content, ('OrderArray', 'Order'), ['HasMoreOrders'])
+    page.get('HasMoreOrders')
+    return list(page.records())
+
+
+def compare(content):
+    """ Return the number of records decoded differently """
+    expected = dict_records(content)
+    records = stream_records(content)
+    if len(expected) != len(records):
+        return max(len(expected), len(records))
+    return sum(1 for record, other in zip(expected, records) if record != other)
+
+
+DECODERS = {
+    'dict':decode_dict,
+    'stream':decode_stream,
+}
+
+
+def _peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run(name, content, queue):
+    baseline = _peak_rss_kb()
+    start = time.time()
+    count = DECODERS[name](content)
+    elapsed = time.time() - start
+    queue.put((name, count, elapsed, _peak_rss_kb() - baseline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--lines', type=int, default=2)
+    args = parser.parse_args()
+
+    content = get_orders_response(args.orders, args.lines)
+    print('payload: %d orders, %.1f MB' % (args.orders, len(content) / 1024. / 1024.))
+    context = multiprocessing.get_context('fork')
+    for name in sorted(DECODERS):
+        queue = context.Queue()
+        process = context.Process(target=_run, args=(name, content, queue))
+        process.start()
+        name, count, elapsed, peak_kb = queue.get()
+        process.join()
+        print('%-6s %6d orders  %8.0f orders/s  peak RSS +%.1f MB'
+              % (name, count, count / elapsed if elapsed else 0., peak_kb / 1024.))
+    print('orders decoded differently: %d' % compare(content))
+
+
+if __name__ == '__main__':
+    main()
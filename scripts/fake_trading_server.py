@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+"""
+
+Stand-in HTTP server for the eBay Trading API.
+
+It answers ``GetOrders``, ``GetSellerList``, ``GetItem``,
+``GetCategories`` and ``ReviseInventoryStatus`` with synthetic data of
+a configurable size and latency, so the importers can be benchmarked
+and load tested without calling eBay. Set the backend API mode to
+"Fake server" and its URL to the address of this server.
+
+An order is created every 10 minutes from 2021-01-01 and modified 5
+minutes later. ``GetOrders`` returns the orders created and modified in
+the periods of ``CreateTimeFrom``/``CreateTimeTo`` and
+``ModTimeFrom``/``ModTimeTo``, the end of a period being excluded.
+
+Usage::
+
+    python scripts/fake_trading_server.py --port 8765 --orders 20000 \
+        --lines 2 --latency 0.3
+
+Only the standard library is needed.
+
+"""
+
+import argparse
+import logging
+import math
+import random
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+_logger = logging.getLogger('fake_trading_server')
+
+EBAY_NAMESPACE = 'urn:ebay:apis:eBLBaseComponents'
+
+START_DATE = datetime(2021, 1, 1)
+ORDER_INTERVAL = 10  # minutes between the creation of two orders
+MODIFIED_DELAY = timedelta(minutes=5)  # modification after the creation
+
+ORDER_TEMPLATE = """<Order>
+<OrderID>{order_id}</OrderID>
+<OrderStatus>Completed</OrderStatus>
+<CheckoutStatus><Status>Complete</Status><LastModifiedTime>{modified}</LastModifiedTime></CheckoutStatus>
+<ShippingServiceSelected><ShippingService>Standard</ShippingService><ShippingServiceCost currencyID="EUR">4.5</ShippingServiceCost></ShippingServiceSelected>
+<ShippingAddress><Name>Buyer {buyer}</Name><Street1>Calle Mayor 1</Street1><CityName>Madrid</CityName><StateOrProvince>Madrid</StateOrProvince><Country>ES</Country><PostalCode>28001</PostalCode><Phone>600000000</Phone></ShippingAddress>
+<Total currencyID="EUR">{total}</Total>
+<CreatedTime>{created}</CreatedTime>
+<BuyerUserID>buyer{buyer}</BuyerUserID>
+<TransactionArray>{transactions}</TransactionArray>
+</Order>"""
+
+TRANSACTION_TEMPLATE = """<Transaction>
+<Buyer><Email>buyer{buyer}@example.com</Email></Buyer>
+<Item><ItemID>{item_id}</ItemID><SKU>SKU-{item}</SKU><Title>Product {item}</Title></Item>
+<QuantityPurchased>1</QuantityPurchased>
+<TransactionID>{order_id}{line}</TransactionID>
+<TransactionPrice currencyID="EUR">10.0</TransactionPrice>
+<ActualShippingCost currencyID="EUR">0.0</ActualShippingCost>
+<OrderLineItemID>{item_id}-{order_id}</OrderLineItemID>
+</Transaction>"""
+
+ITEM_TEMPLATE = """<Item>
+<ItemID>{item_id}</ItemID>
+<SKU>SKU-{item}</SKU>
+<Title>Product {item}</Title>
+<Quantity>{quantity}</Quantity>
+<SellingStatus><CurrentPrice currencyID="EUR">10.0</CurrentPrice><ListingStatus>Active</ListingStatus></SellingStatus>
+<ListingDetails><StartTime>{start}</StartTime></ListingDetails>
+</Item>"""
+
+CATEGORY_TEMPLATE = """<Category>
+<CategoryID>{category_id}</CategoryID>
+<CategoryLevel>{level}</CategoryLevel>
+<CategoryName>Category {category_id}</CategoryName>
+<CategoryParentID>{parent_id}</CategoryParentID>
+<LeafCategory>{leaf}</LeafCategory>
+</Category>"""
+
+
+def _ebay_date(date):
+    return date.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _item_id(item):
+    return '1100%08d' % item
+
+
+def order_xml(index, lines=2, items=100):
+    """ Synthetic order ``index``, one order every ``ORDER_INTERVAL``
+    minutes from ``START_DATE``, modified ``MODIFIED_DELAY`` after its
+    creation, a buyer buys every 5 orders """
+    order_id = '%012d' % index
+    buyer = index // 5
+    created = START_DATE + timedelta(minutes=ORDER_INTERVAL * index)
+    transactions = ''.join(
+        TRANSACTION_TEMPLATE.format(order_id=order_id, buyer=buyer, line=line,
+                                    item=(index + line) % items,
+                                    item_id=_item_id((index + line) % items))
+        for line in range(lines))
+    return ORDER_TEMPLATE.format(order_id=order_id, buyer=buyer, total=10.0 * lines + 4.5,
+                                 created=_ebay_date(created),
+                                 modified=_ebay_date(created + MODIFIED_DELAY),
+                                 transactions=transactions)
+
+
+def item_xml(index):
+    return ITEM_TEMPLATE.format(item=index, item_id=_item_id(index), quantity=index % 20,
+                                start=_ebay_date(START_DATE))
+
+
+def category_xml(index, categories, children=10):
+    """ Category ``index`` of a tree where each category has ``children``
+    children, the first ``children`` categories are the roots """
+    parent = index // children - 1 if index >= children else index
+    level, node = 1, index
+    while node >= children:
+        node = node // children - 1
+        level += 1
+    return CATEGORY_TEMPLATE.format(category_id=index + 1, level=level, parent_id=parent + 1,
+                                    leaf='true' if children * (index + 1) >= categories else 'false')
+
+
+def response_xml(verb, body='', ack='Success'):
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<{verb}Response xmlns="{ns}">'
+            '<Timestamp>{timestamp}</Timestamp><Ack>{ack}</Ack>'
+            '<Version>1149</Version>{body}'
+            '</{verb}Response>').format(verb=verb, ns=EBAY_NAMESPACE, ack=ack, body=body,
+                                        timestamp=_ebay_date(datetime.utcnow())).encode('utf-8')
+
+
+def error_xml(verb, code, message, classification='RequestError'):
+    return response_xml(verb, ack='Failure', body=(
+        '<Errors><ShortMessage>{message}</ShortMessage><LongMessage>{message}</LongMessage>'
+        '<ErrorCode>{code}</ErrorCode><SeverityCode>Error</SeverityCode>'
+        '<ErrorClassification>{classification}</ErrorClassification></Errors>'
+    ).format(message=message, code=code, classification=classification))
+
+
+def paginated_xml(verb, records, total, page_number, per_page, container, has_more_tag, per_page_tag):
+    pages = max((total + per_page - 1) // per_page, 1)
+    return response_xml(verb, body=(
+        '<PaginationResult><TotalNumberOfPages>{pages}</TotalNumberOfPages>'
+        '<TotalNumberOfEntries>{total}</TotalNumberOfEntries></PaginationResult>'
+        '<{has_more_tag}>{has_more}</{has_more_tag}>'
+        '<{container}>{records}</{container}>'
+        '<{per_page_tag}>{per_page}</{per_page_tag}><PageNumber>{page}</PageNumber>'
+    ).format(pages=pages, total=total, has_more_tag=has_more_tag,
+             has_more='true' if page_number < pages else 'false',
+             container=container, records=''.join(records),
+             per_page_tag=per_page_tag, per_page=per_page, page=page_number))
+
+
+def get_orders_response(orders, lines, page_number=1, per_page=None, items=100, indexes=None):
+    """ Build a GetOrders response, page ``page_number`` of ``orders``
+    orders, or of the orders of ``indexes`` (a range) when it is given """
+    if indexes is None:
+        indexes = range(orders)
+    per_page = per_page or max(len(indexes), 1)
+    first = (page_number - 1) * per_page
+    records = [order_xml(index, lines=lines, items=items)
+               for index in indexes[first:first + per_page]]
+    return paginated_xml('GetOrders', records, len(indexes), page_number, per_page,
+                         'OrderArray', 'HasMoreOrders', 'OrdersPerPage')
+
+
+def _parse_ebay_date(value):
+    return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+
+
+def _first_order_at(date, offset):
+    """ Index of the first order whose date, ``offset`` after its creation,
+    is at or after ``date`` """
+    minutes = (date - START_DATE - offset).total_seconds() / 60.
+    return max(int(math.ceil(minutes / ORDER_INTERVAL)), 0)
+
+
+def order_indexes(orders, created_from=None, created_to=None, modified_from=None, modified_to=None):
+    """ Range of the orders created and modified in the given periods,
+    the beginning of a period is included and its end excluded """
+    first, last = 0, orders
+    for date_from, date_to, offset in ((created_from, created_to, timedelta(0)),
+                                       (modified_from, modified_to, MODIFIED_DELAY)):
+        if date_from:
+            first = max(first, _first_order_at(date_from, offset))
+        if date_to:
+            last = min(last, _first_order_at(date_to, offset))
+    return range(first, max(first, last))
+
+
+class FakeTradingHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        _logger.debug(format, *args)
+
+    def _find(self, request, path, default=None):
+        node = request.find('/'.join('{%s}%s' % (EBAY_NAMESPACE, tag) for tag in path.split('/')))
+        return node.text if node is not None and node.text else default
+
+    def _pagination(self, request, default_per_page):
+        per_page = int(self._find(request, 'Pagination/EntriesPerPage', default_per_page))
+        page_number = int(self._find(request, 'Pagination/PageNumber', 1))
+        return page_number, per_page
+
+    def get_orders(self, request):
+        options = self.server.options
+        order_ids = [node.text for node in request.iter('{%s}OrderID' % EBAY_NAMESPACE)]
+        if order_ids:
+            records = [order_xml(int(order_id), options.lines, options.items)
+                       for order_id in order_ids if order_id.isdigit() and int(order_id) < options.orders]
+            return paginated_xml('GetOrders', records, len(records), 1, max(len(records), 1),
+                                 'OrderArray', 'HasMoreOrders', 'OrdersPerPage')
+        page_number, per_page = self._pagination(request, 100)
+        dates = dict((tag, _parse_ebay_date(self._find(request, tag)))
+                     for tag in ('CreateTimeFrom', 'CreateTimeTo', 'ModTimeFrom', 'ModTimeTo')
+                     if self._find(request, tag))
+        indexes = order_indexes(options.orders,
+                                created_from=dates.get('CreateTimeFrom'),
+                                created_to=dates.get('CreateTimeTo'),
+                                modified_from=dates.get('ModTimeFrom'),
+                                modified_to=dates.get('ModTimeTo'))
+        return get_orders_response(options.orders, options.lines, page_number, per_page,
+                                   options.items, indexes=indexes)
+
+    def get_seller_list(self, request):
+        options = self.server.options
+        page_number, per_page = self._pagination(request, 200)
+        first = (page_number - 1) * per_page
+        records = [item_xml(index) for index in range(first, min(first + per_page, options.items))]
+        return paginated_xml('GetSellerList', records, options.items, page_number, per_page,
+                             'ItemArray', 'HasMoreItems', 'ItemsPerPage')
+
+    def get_item(self, request):
+        item_id = self._find(request, 'ItemID', '')
+        index = int(item_id[4:] or -1) if item_id.startswith('1100') else -1
+        if not 0 <= index < self.server.options.items:
+            return error_xml('GetItem', 17, 'This item cannot be accessed.')
+        return response_xml('GetItem', body=item_xml(index))
+
+    def get_categories(self, request):
+        categories = self.server.options.categories
+        records = [category_xml(index, categories) for index in range(categories)]
+        return response_xml('GetCategories', body=(
+            '<CategoryArray>%s</CategoryArray><CategoryCount>%d</CategoryCount>'
+            '<CategoryVersion>1</CategoryVersion>') % (''.join(records), len(records)))
+
+    def revise_inventory_status(self, request):
+        statuses = []
+        for status in request.iter('{%s}InventoryStatus' % EBAY_NAMESPACE):
+            statuses.append('<InventoryStatus>%s</InventoryStatus>' % ''.join(
+                ET.tostring(child, encoding='unicode').replace(' xmlns:ns0="%s"' % EBAY_NAMESPACE, '')
+                .replace('ns0:', '') for child in status))
+        return response_xml('ReviseInventoryStatus', body=''.join(statuses))
+
+    VERBS = {
+        'GetOrders':get_orders,
+        'GetSellerList':get_seller_list,
+        'GetItem':get_item,
+        'GetCategories':get_categories,
+        'ReviseInventoryStatus':revise_inventory_status,
+    }
+
+    def do_POST(self):
+        options = self.server.options
+        verb = self.headers.get('X-EBAY-API-CALL-NAME', '')
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if options.latency:
+            time.sleep(max(random.gauss(options.latency, options.latency / 4.), 0))
+        handler = self.VERBS.get(verb)
+        if not handler:
+            content = error_xml(verb or 'Unknown', 2, 'Unsupported API call.')
+        elif options.error_rate and random.random() < options.error_rate:
+            content = error_xml(verb, 10007, 'Internal error to the application.', 'SystemError')
+        else:
+            content = handler(self, ET.fromstring(body))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml;charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakeTradingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        HTTPServer.__init__(self, address, FakeTradingHandler)
+        self.options = options
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--orders', type=int, default=1000, help='number of orders')
+    parser.add_argument('--lines', type=int, default=2, help='lines per order')
+    parser.add_argument('--items', type=int, default=100, help='number of listed items')
+    parser.add_argument('--categories', type=int, default=1000, help='number of categories')
+    parser.add_argument('--latency', type=float, default=0., help='mean latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.,
+                        help='share of the calls answered with a transient error')
+    options = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = FakeTradingServer((options.host, options.port), options)
+    _logger.info('Fake Trading API listening on %s:%s', options.host, options.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import copy
+
+from odoo.addons.component.tests.common import SavepointComponentCase
+
+# a GetOrders Order as decoded from the response, with the fields read
+# by the import
+ORDER = {
+    'OrderID':'110000000001-1000000000001',
+    'OrderStatus':'Completed',
+    'CheckoutStatus':{'Status':'Complete',
+                      'LastModifiedTime':'2021-01-01T10:05:00.000Z'},
+    'ShippingServiceSelected':{
+        'ShippingService':'ES_CorreosCartasCertificadas',
+        'ShippingServiceCost':{'_currencyID':'EUR', 'value':'4.5'},
+        'ShippingPackageInfo':{
+            'EstimatedDeliveryTimeMin':'2021-01-04T10:00:00.000Z',
+            'EstimatedDeliveryTimeMax':'2021-01-07T10:00:00.000Z',
+            'HandleByTime':'2021-01-02T10:00:00.000Z',
+        },
+    },
+    'ShippingAddress':{'Name':'Buyer One',
+                       'Street1':'Calle Mayor 1',
+                       'CityName':'Madrid',
+                       'StateOrProvince':'Madrid',
+                       'Country':'ES',
+                       'PostalCode':'28001',
+                       'Phone':'600000000'},
+    'Total':{'_currencyID':'EUR', 'value':'24.5'},
+    'CreatedTime':'2021-01-01T10:00:00.000Z',
+    'BuyerUserID':'buyer1',
+    'TransactionArray':{'Transaction':[
+        {'Buyer':{'Email':'buyer1@example.com'},
+         'Item':{'ItemID':'110000000001', 'SKU':'SKU-1', 'Title':'Product 1'},
+         'QuantityPurchased':'1',
+         'TransactionPrice':{'_currencyID':'EUR', 'value':'10.1'},
+         'ActualShippingCost':{'_currencyID':'EUR', 'value':'0.0'},
+         'OrderLineItemID':'110000000001-1000000000001'},
+        {'Buyer':{'Email':'buyer1@example.com'},
+         'Item':{'ItemID':'110000000002', 'SKU':'SKU-2', 'Title':'Product 2'},
+         'QuantityPurchased':'2',
+         'TransactionPrice':{'_currencyID':'EUR', 'value':'5.0'},
+         'ActualShippingCost':{'_currencyID':'EUR', 'value':'0.0'},
+         'OrderLineItemID':'110000000002-1000000000002'},
+    ]},
+}
+
+
+class EbayTestCase(SavepointComponentCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(EbayTestCase, cls).setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.backend = cls.env['ebay.backend'].create({
+            'name':'eBay test',
+            'warehouse_id':cls.env.ref('stock.warehouse0').id,
+        })
+
+    def parse_order(self, order=ORDER):
+        """ Return the order parsed by the adapter, as given to the mappers """
+        with self.backend.work_on('ebay.sale.order') as work:
+            adapter = work.component(usage='backend.adapter')
+            return adapter._parse_order(copy.deepcopy(order))
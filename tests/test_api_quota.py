@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from psycopg2 import IntegrityError
+
+from odoo.tools import mute_logger
+
+from .common import EbayTestCase
+
+
+class TestApiQuota(EbayTestCase):
+
+    @mute_logger('odoo.sql_db')
+    def test_rate_must_be_positive(self):
+        """ A bucket without rate would never refill """
+        with self.assertRaises(IntegrityError), self.env.cr.savepoint():
+            self.env['ebay.api.quota'].create({'backend_id':self.backend.id,
+                                               'method':'GetOrders',
+                                               'rate':0.})
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from datetime import datetime
+
+from unittest import mock
+
+from .common import EbayTestCase
+
+
+class TestImportCheckpoint(EbayTestCase):
+
+    def setUp(self):
+        super(TestImportCheckpoint, self).setUp()
+        self.checkpoint = self.env['ebay.import.checkpoint'].for_stream(self.backend, 'modified')
+        self.checkpoint.start(datetime(2021, 1, 1), datetime(2021, 1, 2))
+        self.backend.import_sales_from_date = '2021-01-01 00:00:00'
+        job = self.env['ebay.sale.order'].with_delay().import_batch(self.backend)
+        self.job = self.env['queue.job'].search([('uuid', '=', job.uuid)])
+        self.checkpoint.advance(3, 'order-3', record_count=300)
+        self.checkpoint.wait(job_uuid=self.job.uuid)
+
+    def _import(self):
+        """ Run the import of the orders, the import of a window finishes
+        its checkpoint """
+        def import_batch(backend, filters=None, checkpoint=None):
+            checkpoint.finish()
+        model_class = type(self.env['ebay.sale.order'])
+        with mock.patch.object(model_class, 'import_batch', side_effect=import_batch, autospec=False) as mocked:
+            self.backend._import_order_stream('modified', datetime(2021, 1, 1), datetime(2021, 1, 2))
+        return mocked
+
+    def test_waiting_for_live_job(self):
+        """ The window is left to its job while the job may run """
+        mocked = self._import()
+        mocked.assert_not_called()
+        self.assertEqual(self.checkpoint.state, 'waiting')
+
+    def test_waiting_for_failed_job(self):
+        """ The window of a failed job is resumed from its last page """
+        self.job.state = 'failed'
+        mocked = self._import()
+        self.assertEqual(mocked.call_count, 1)
+        filters = mocked.call_args[1]['filters']
+        self.assertEqual(filters['Pagination'], {'PageNumber':3})
+        self.assertEqual(filters['ModTimeFrom'], '2021-01-01T00:00:00')
+        self.assertEqual(self.checkpoint.state, 'done')
+        self.assertEqual(self.backend.import_sales_from_date, '2021-01-02 00:00:00')
+
+    def test_resumed_page_counted_once(self):
+        """ The last page imported again by a resumed window is counted
+        once in the records of the window """
+        self.checkpoint.start(datetime(2021, 1, 1), datetime(2021, 1, 2))
+        self.checkpoint.advance(1, 'order-1', record_count=100)
+        self.checkpoint.advance(2, 'order-2', record_count=100)
+        self.checkpoint.advance(2, 'order-2', record_count=90)
+        self.assertEqual(self.checkpoint.record_count, 190)
+        self.checkpoint.advance(3, 'order-3', record_count=50)
+        self.assertEqual(self.checkpoint.record_count, 240)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from .common import EbayTestCase
+
+
+class TestImportRecord(EbayTestCase):
+
+    def test_force_import(self):
+        """ An import with force updates a record whose eBay data has
+        not changed, the others skip it as up-to-date """
+        record = {'SKU':'SKU-1', 'ItemID':'110000000001', 'Title':'Product 1'}
+        model = self.env['ebay.product.product']
+        binding = model.import_record(self.backend, ('SKU-1', dict(record)))
+        self.assertEqual(binding.name, 'Product 1')
+        binding.name = 'Renamed'
+        model.import_record(self.backend, ('SKU-1', dict(record)))
+        self.assertEqual(binding.name, 'Renamed')
+        model.import_record(self.backend, ('SKU-1', dict(record)), force=True)
+        self.assertEqual(binding.name, 'Product 1')
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from .common import EbayTestCase
+
+
+class TestCompiledMapper(EbayTestCase):
+
+    def setUp(self):
+        super(TestCompiledMapper, self).setUp()
+        self.order = self.parse_order()
+        for line in self.order['lines']:
+            self.env['ebay.product.product'].create({'backend_id':self.backend.id,
+                                                     'external_id':line['sku'],
+                                                     'sku':line['sku'],
+                                                     'name':line['name']})
+        self.partner = self.env['ebay.res.partner'].create({'backend_id':self.backend.id,
+                                                            'external_id':'buyer1@example.com',
+                                                            'name':'Buyer One',
+                                                            'email':'buyer1@example.com'})
+
+    def _map(self, work, compiled):
+        """ Map the order and its lines with the compiled or the generic
+        mappers, ``_ebay_compiled_mapper`` None selects the generic one """
+        mappers = [work.component(usage='import.mapper'),
+                   work.component(usage='import.mapper', model_name='ebay.sale.order.line')]
+        classes = [type(mapper) for mapper in mappers]
+        try:
+            for mapper in mappers:
+                if compiled:
+                    self.assertIsNotNone(mapper._compiled_mapper())
+                else:
+                    type(mapper)._ebay_compiled_mapper = None
+            return mappers[0].map_record(self.order).values(for_create=True)
+        finally:
+            for cls in classes:
+                if '_ebay_compiled_mapper' in cls.__dict__:
+                    del cls._ebay_compiled_mapper
+
+    def test_compiled_equals_generic(self):
+        """ The compiled mappers map a sale order like the generic ones """
+        with self.backend.work_on('ebay.sale.order') as work:
+            generic = self._map(work, False)
+            compiled = self._map(work, True)
+        self.assertEqual(compiled, generic)
+        self.assertEqual(compiled['external_id'], '110000000001-1000000000001')
+        self.assertEqual(compiled['date_latest_ship'], '2021-01-02 10:00:00')
+        self.assertEqual(len(compiled['ebay_order_line_ids']), 2)
+        self.assertEqual(compiled['partner_id'], self.partner.odoo_id.id)
+        self.assertEqual(compiled['partner_shipping_id'], self.partner.odoo_id.id)
+        self.assertEqual(compiled['order_line'], [])
+
+    def test_profile_mapping(self):
+        """ The mapping of the records is profiled by the compiled and
+        the generic mappers """
+        self.backend.import_profiling = True
+        for compiled, step in ((True, 'direct'), (False, 'map')):
+            with self.backend.work_on('ebay.sale.order') as work:
+                self._map(work, compiled)
+                steps = work.ebay_cache.profile.steps
+            self.assertIn(('ebay.sale.order.mapper', step), steps)
+            self.assertIn(('ebay.sale.order.line.mapper', step), steps)
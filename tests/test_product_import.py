@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from odoo.addons.queue_job.job import Job
+
+from .common import EbayTestCase
+
+# records of a GetSellerList page, as parsed by the adapter
+ITEMS = [('SKU-%d' % index, {'SKU':'SKU-%d' % index,
+                             'ItemID':'1100%08d' % index,
+                             'Title':'Product %d' % index})
+         for index in range(3)]
+
+
+class TestProductImport(EbayTestCase):
+
+    def test_import_by_chunks(self):
+        """ The items of a page are imported by one job for each chunk """
+        self.backend.import_chunk_size = 2
+        with self.backend.work_on('ebay.product.product') as work:
+            work.component(usage='batch.importer')._import_page(list(ITEMS))
+        jobs = self.env['queue.job'].search([('model_name', '=', 'ebay.product.product'),
+                                             ('method_name', '=', 'import_chunk')])
+        self.assertEqual(len(jobs), 2)
+        for job in jobs:
+            Job.load(self.env, job.uuid).perform()
+        products = self.env['ebay.product.product'].search([('backend_id', '=', self.backend.id)])
+        self.assertEqual(sorted(products.mapped('sku')), ['SKU-0', 'SKU-1', 'SKU-2'])
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from .common import EbayTestCase
+
+
+class TestReferenceCache(EbayTestCase):
+
+    def _cached_keys(self):
+        return [key for key in self.registry.cache if key[0] == 'ebay.reference.cache']
+
+    def test_team_created(self):
+        """ A sales team created is found by the next lookups, the
+        lookups of the other models are kept """
+        cache = self.env['ebay.reference.cache']
+        self.assertFalse(cache.team_id('eBay Sales Test'))
+        currency_id = cache.currency_id('EUR')
+        keys = self._cached_keys()
+        team = self.env['crm.team'].create({'name':'eBay Sales Test'})
+        self.assertEqual(cache.team_id('eBay Sales Test'), team.id)
+        self.assertTrue(set(keys) <= set(self._cached_keys()))
+        self.assertEqual(cache.currency_id('EUR'), currency_id)
+
+    def test_team_lang(self):
+        """ The teams are looked up by their name in the language of the
+        context """
+        cache = self.env['ebay.reference.cache']
+        cache.team_id('eBay Sales Test')
+        keys = self._cached_keys()
+        cache.with_context(lang='fr_FR').team_id('eBay Sales Test')
+        self.assertEqual(len(self._cached_keys()), len(keys) + 1)
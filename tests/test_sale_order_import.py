@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+import copy
+
+from .common import EbayTestCase
+
+
+class TestSaleOrderImport(EbayTestCase):
+
+    def test_parse_order_with_shipping_service(self):
+        """ An order with a shipping service is parsed and its direct
+        mappings only target fields of the binding """
+        order = self.parse_order()
+        self.assertEqual(order['order_id'], '110000000001-1000000000001')
+        self.assertEqual(order['date_order'], '2021-01-01 10:00:00')
+        self.assertEqual(order['date_modified'], '2021-01-01 10:05:00')
+        self.assertEqual(order['currency'], 'EUR')
+        self.assertEqual(order['total_ship_amount'], '4.5')
+        self.assertEqual(order['earlest_delivery_date'], '2021-01-04 10:00:00')
+        self.assertEqual(order['lastest_delivery_date'], '2021-01-07 10:00:00')
+        self.assertEqual(order['lastest_ship_date'], '2021-01-02 10:00:00')
+        self.assertNotIn('ship_service_level', order)
+        self.assertEqual(order['partner']['email'], 'buyer1@example.com')
+        self.assertEqual(order['partner']['city'], 'Madrid')
+        self.assertEqual([(line['sku'], line['qty_ordered'], line['price_unit'])
+                          for line in order['lines']],
+                         [('SKU-1', 1, 10.1), ('SKU-2', 2, 5.0)])
+        model = self.env['ebay.sale.order']
+        with self.backend.work_on('ebay.sale.order') as work:
+            mapper = work.component(usage='import.mapper')
+            for from_attr, to_attr in mapper.direct:
+                if isinstance(from_attr, str) and order.get(from_attr):
+                    self.assertIn(to_attr, model._fields)
+                    self.assertEqual(mapper._map_direct(order, from_attr, to_attr), order[from_attr])
+
+    def test_import_missing_products(self):
+        """ The missing products of the lines are imported from the data
+        of the lines """
+        order = self.parse_order()
+        with self.backend.work_on('ebay.sale.order') as work:
+            work.component(usage='record.importer')._import_products(order['lines'])
+        products = self.env['ebay.product.product'].search([('backend_id', '=', self.backend.id)])
+        self.assertEqual(sorted(products.mapped('sku')), ['SKU-1', 'SKU-2'])
+        self.assertEqual(products.filtered(lambda product: product.sku == 'SKU-1').name, 'Product 1')
+
+    def test_import_order(self):
+        """ An order is created with its buyer, its lines and their
+        products """
+        order = self.parse_order()
+        self.env['ebay.sale.order'].import_record(self.backend, (order['order_id'], order))
+        binding = self.env['ebay.sale.order'].search([('backend_id', '=', self.backend.id),
+                                                      ('external_id', '=', order['order_id'])])
+        self.assertEqual(len(binding), 1)
+        partner = self.env['ebay.res.partner'].search([('backend_id', '=', self.backend.id),
+                                                       ('external_id', '=', 'buyer1@example.com')])
+        self.assertEqual(binding.partner_id, partner.odoo_id)
+        self.assertEqual(binding.partner_invoice_id, partner.odoo_id)
+        self.assertEqual(binding.partner_shipping_id, partner.odoo_id)
+        self.assertEqual(binding.odoo_id.order_line, binding.ebay_order_line_ids.mapped('odoo_id'))
+        self.assertEqual(sorted((line.product_id.name, line.product_uom_qty, line.price_unit)
+                                for line in binding.ebay_order_line_ids),
+                         [('Product 1', 1, 10.1), ('Product 2', 2, 5.0)])
+
+    def test_orders_to_import(self):
+        """ The orders up-to-date are not prepared for the import """
+        order = self.parse_order()
+        self.env['ebay.sale.order'].import_record(self.backend, (order['order_id'], copy.deepcopy(order)))
+        records = [(order['order_id'], order)]
+        with self.backend.work_on('ebay.sale.order') as work:
+            importer = work.component(usage='batch.importer')
+            self.assertEqual(importer._orders_to_import(records), [])
+        changed = dict(order, date_modified='2021-01-01 11:00:00')
+        with self.backend.work_on('ebay.sale.order') as work:
+            importer = work.component(usage='batch.importer')
+            self.assertEqual(importer._orders_to_import([(order['order_id'], changed)]), [changed])
+
+    def test_prefetch_bindings(self):
+        """ The partners and the products of the orders of a page are
+        resolved at once in the cache of the session """
+        order = self.parse_order()
+        partner = self.env['ebay.res.partner'].create({'backend_id':self.backend.id,
+                                                       'external_id':'buyer1@example.com',
+                                                       'name':'Buyer One',
+                                                       'email':'buyer1@example.com'})
+        with self.backend.work_on('ebay.sale.order') as work:
+            work.component(usage='batch.importer')._prefetch_bindings([(order['order_id'], order)])
+            bindings = work.ebay_cache.bindings
+        self.assertEqual(bindings['ebay.res.partner'], {'buyer1@example.com':partner.id})
+        self.assertEqual(bindings['ebay.product.product'], {'SKU-1':False, 'SKU-2':False})
+
+    def test_output_selector_date_modified(self):
+        """ The searches request the date of modification of the orders,
+        read for the checkpoints """
+        with self.backend.work_on('ebay.sale.order') as work:
+            selector = work.component(usage='backend.adapter')._output_selector()
+        self.assertIn('OrderArray.Order.CheckoutStatus.LastModifiedTime', selector)
+        self.assertIn('OrderArray.Order.CreatedTime', selector)
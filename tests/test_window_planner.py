@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+##############################################################################
+#
+#    Odoo, Open Source Management Solution
+#    Copyright (C) 2021 Halltic Tech S.L. (https://www.halltic.com)
+#                  Tristán Mozos <tristan.mozos@halltic.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+
+from datetime import datetime, timedelta
+
+from odoo.tests.common import BaseCase
+
+from ..components.window_planner import WindowPlanner
+
+
+class TestWindowPlanner(BaseCase):
+
+    def test_merge_short_tail(self):
+        """ A tail shorter than the minimum is merged in the last window """
+        start = datetime(2021, 1, 1)
+        end = start + timedelta(days=1, minutes=3)
+        planner = WindowPlanner()
+        self.assertEqual(list(planner.windows(start, end)), [(start, end)])
+
+    def test_short_tail_after_max_span(self):
+        """ A tail shorter than the minimum is its own window when the
+        merged window would exceed the maximum span """
+        start = datetime(2021, 1, 1)
+        end = start + timedelta(days=30, minutes=3)
+        planner = WindowPlanner(density=0.001)
+        self.assertEqual(list(planner.windows(start, end)),
+                         [(start, start + timedelta(days=30)),
+                          (start + timedelta(days=30), end)])